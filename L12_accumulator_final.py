@@ -2,14 +2,35 @@
 Seeing a (design) pattern!!
 """
 
-from typing import Callable, Generic, Iterable, TypeVar
-from collections.abc import Sized
-
-from functools import reduce
-from itertools import accumulate
-
+# lecture code and its tests live together in one file
+# pylint: disable=too-many-lines
+
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar, overload
+from collections import OrderedDict, deque
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Hashable, Sized
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from types import CellType, CodeType, FunctionType
+from unittest.mock import Mock
+
+from functools import partial, reduce
+from itertools import accumulate, chain, count, islice, repeat
+
+import array
+import asyncio
+import importlib
+import marshal
+import math
+import os
+import pickle
+import sys
+import tempfile
+import time
 import unittest
 
+import numpy as np
+import pandas as pd
+
 ############################################################
 # 1. Consider the following functions
 # 2. Replace them with list comprehensions
@@ -101,6 +122,157 @@ def how_long(phrases: list[str]) -> list[str]:
 
     return result
 
+# (Column versions: same results, but on whole NumPy
+#  string arrays / pandas Series, with no Python loop)
+
+# variable-width strings (pylint can't see numpy 2's dtypes)
+STRING_DTYPE: np.dtype = np.dtypes.StringDType()  # pylint: disable=no-member
+
+def _like(result: np.ndarray, phrases: np.ndarray) -> np.ndarray:
+    """
+    Casts a StringDType result back to
+    the input's kind of string array
+
+    Parameters
+    ==========
+    result: np.ndarray
+        variable-width (StringDType) strings
+
+    phrases: np.ndarray
+        original input
+
+    Returns
+    =======
+    np.ndarray
+        fixed-width if the input was,
+        else result as-is
+    """
+
+    if phrases.dtype.kind != 'U':
+        return result
+
+    width: int = int(np.strings.str_len(result).max(initial=1))
+    return result.astype(f"U{max(width, 1)}")
+
+@overload
+def excite_column(phrases: np.ndarray) -> np.ndarray: ...
+
+@overload
+def excite_column(phrases: pd.Series) -> pd.Series: ...
+
+def excite_column(phrases: np.ndarray | pd.Series) -> np.ndarray | pd.Series:
+    """
+    Adds ! to the end of all inputs
+    (column version of excite)
+
+    Parameters
+    ==========
+    phrases: np.ndarray | pd.Series
+        phrases to excite
+
+    Returns
+    =======
+    np.ndarray | pd.Series
+        inputs + "!" (same kind as input)
+    """
+
+    if isinstance(phrases, pd.Series):
+        return phrases + '!'
+
+    return np.strings.add(phrases, '!')
+
+@overload
+def super_excite_column(phrases: np.ndarray) -> np.ndarray: ...
+
+@overload
+def super_excite_column(phrases: pd.Series) -> pd.Series: ...
+
+def super_excite_column(phrases: np.ndarray | pd.Series) -> np.ndarray | pd.Series:
+    """
+    Adds !!! to the end of all inputs
+    (column version of super_excite)
+
+    Parameters
+    ==========
+    phrases: np.ndarray | pd.Series
+        phrases to excite
+
+    Returns
+    =======
+    np.ndarray | pd.Series
+        inputs + "!!!" (same kind as input)
+    """
+
+    if isinstance(phrases, pd.Series):
+        return phrases + '!!!'
+
+    return np.strings.add(phrases, '!!!')
+
+@overload
+def amplify_column(phrases: np.ndarray) -> np.ndarray: ...
+
+@overload
+def amplify_column(phrases: pd.Series) -> pd.Series: ...
+
+def amplify_column(phrases: np.ndarray | pd.Series) -> np.ndarray | pd.Series:
+    """
+    Converts inputs to CAPS
+    (column version of amplify)
+
+    Parameters
+    ==========
+    phrases: np.ndarray | pd.Series
+        phrases to amplify
+
+    Returns
+    =======
+    np.ndarray | pd.Series
+        INPUTS (same kind as input)
+    """
+
+    if isinstance(phrases, pd.Series):
+        return phrases.str.upper()
+
+    # variable-width, so e.g. "ß" -> "SS" isn't truncated
+    return _like(np.strings.upper(phrases.astype(STRING_DTYPE)), phrases)
+
+@overload
+def how_long_column(phrases: np.ndarray) -> np.ndarray: ...
+
+@overload
+def how_long_column(phrases: pd.Series) -> pd.Series: ...
+
+def how_long_column(phrases: np.ndarray | pd.Series) -> np.ndarray | pd.Series:
+    """
+    Describes the lengths of the
+    inputs (column version of how_long)
+
+    Parameters
+    ==========
+    phrases: np.ndarray | pd.Series
+        phrases to describe
+
+    Returns
+    =======
+    np.ndarray | pd.Series
+        ["k long" (where k is the length
+        of the phrase)] (same kind as input)
+    """
+
+    if isinstance(phrases, pd.Series):
+        return phrases.str.len().astype(str) + ' long'
+
+    lengths: np.ndarray = np.strings.str_len(phrases)
+    return _like(np.strings.add(lengths.astype(STRING_DTYPE), ' long'), phrases)
+
+# (list version, column version) of each string function
+COLUMN_VERSIONS: tuple[tuple[Callable[[list[str]], list[str]], Callable[..., Any]], ...] = (
+    (excite, excite_column),
+    (super_excite, super_excite_column),
+    (amplify, amplify_column),
+    (how_long, how_long_column),
+)
+
 ############################################################
 # 3. Create (and test) one function to rule them ALL!!!!!
 #    (termed an "abstraction")
@@ -108,302 +280,2323 @@ def how_long(phrases: list[str]) -> list[str]:
 
 T = TypeVar('T')
 U = TypeVar('U')
+F = TypeVar('F', bound=Callable[..., Any])
+
+############################################################
+# (Execution backends: where do_to_all & friends
+#  actually call the function)
+############################################################
 
-def do_to_all(items: Iterable[T], f: Callable[[T], U]) -> list[U]:
+class _PortableFunction:
+    """
+    Picklable stand-in for a function that
+    pickle can't find by name (lambdas,
+    closures): it travels as marshalled
+    code plus its closure's contents
     """
-    Applies a function to all the elements of the input
-    and returns a list of the resulting outputs
 
-    see: map in Python :)
+    def __init__(self, f: FunctionType) -> None:
+        """
+        Initializes _PortableFunction object
+
+        Parameters
+        ==========
+        f: FunctionType
+            function to wrap
+        """
+
+        self._f: FunctionType = f
+        self.__name__: str = f.__name__
+        self.__qualname__: str = f.__qualname__
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """Calls the wrapped function"""
+
+        return self._f(*args, **kwargs)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickles as code + closure contents"""
+
+        f: FunctionType = self._f
+        closure: tuple[CellType, ...] = f.__closure__ or ()
+
+        # a recursive inner function's closure holds the function
+        # itself: send those cells' indexes, not the function again
+        self_cells: tuple[int, ...] = tuple(
+            i for i, c in enumerate(closure) if c.cell_contents is f
+        )
+        cells: tuple[Any, ...] = tuple(
+            None if i in self_cells else _portable(c.cell_contents)
+            for i, c in enumerate(closure)
+        )
+
+        attrs: dict[str, Any] = {
+            '__name__': f.__name__,
+            '__qualname__': f.__qualname__,
+            '__defaults__': f.__defaults__,
+            '__kwdefaults__': f.__kwdefaults__,
+        }
+
+        return (
+            _rebuild_function,
+            (marshal.dumps(f.__code__), f.__module__, attrs, cells, self_cells)
+        )
+
+def _rebuild_function(code: bytes, module: str, attrs: dict[str, Any],
+                      cells: tuple[Any, ...], self_cells: tuple[int, ...]) -> _PortableFunction:
+    """
+    Unpickles a _PortableFunction (in
+    the worker process)
 
     Parameters
     ==========
-    items: Iterable[T]
-        items upon which to do
+    code: bytes
+        marshalled code object
 
-    f: Callable[[T], U]
-        what to do to an item
+    module: str
+        name of the module whose globals
+        the function uses
+
+    attrs: dict[str, Any]
+        function attributes: name,
+        qualified name, and (keyword-only)
+        argument defaults
+
+    cells: tuple[Any, ...]
+        closure contents
+
+    self_cells: tuple[int, ...]
+        indexes of the cells that hold
+        the function itself
 
     Returns
     =======
-    list[U]
-        list of results
+    _PortableFunction
+        equivalent function
     """
 
-    return [f(i) for i in items]
+    mod = sys.modules.get(module) or importlib.import_module(module)
+    code_obj: CodeType = marshal.loads(code)
+    closure: tuple[CellType, ...] = tuple(CellType(c) for c in cells)
 
-def make_excitement(how_many: int) -> Callable[[str], str]:
+    f: FunctionType = FunctionType(code_obj, vars(mod), closure=closure)
+    for attr, value in attrs.items():
+        setattr(f, attr, value)
+
+    for i in self_cells:
+        closure[i].cell_contents = f
+
+    return _PortableFunction(f)
+
+def _portable(f: Any) -> Any:
     """
-    Creates a function for adding !'s
+    Makes f safe to send to worker
+    processes
 
     Parameters
     ==========
-    how_many: int
-        how many !'s to add
+    f: Any
+        function (or value) to send
 
     Returns
     =======
-    Callable[[str], str]:
-        function to excite a supplied string
+    Any
+        f itself if pickle can handle it,
+        else a _PortableFunction
 
     Raises
     ======
-    ValueError
-        supplied negative
+    pickle.PicklingError
+        f can't be sent at all
     """
 
-    if how_many < 0:
-        raise ValueError("Must have non-negative excitement")
-
-    def f(phrase: str) -> str:
-        return f"{phrase}{ how_many * '!' }"
-
-    return f
-    # return lambda phrase: f"{phrase}{ how_many * '!' }"
+    try:
+        pickle.dumps(f)
+        return f
+    except (pickle.PicklingError, AttributeError, TypeError):
+        if isinstance(f, FunctionType):
+            return _PortableFunction(f)
+        raise
 
-class Excite(Generic[T]):
+class Backend:
     """
-    Function object for adding !'s
+    Serial execution backend (and the
+    base for the parallel ones)
     """
 
-    def __init__(self, how_excited: int) -> None:
+    def __init__(self, chunksize: int = 256) -> None:
         """
-        Initializes Excite object
+        Initializes Backend object
 
         Parameters
         ==========
-        how_excited: int
-            how many !'s to add
+        chunksize: int
+            items per unit of work
 
         Raises
         ======
-        ValueError:
-            supplied negative how_excited
+        ValueError
+            non-positive chunksize
         """
 
-        if how_excited < 0:
-            raise ValueError("Must have non-negative excitement")
+        if chunksize < 1:
+            raise ValueError("Must have positive chunksize")
 
-        self._n: int = how_excited
+        self.chunksize: int = chunksize
 
-    def __call__(self, phrase: str) -> str:
+    def prepare(self, f: Callable[..., U]) -> Callable[..., U]:
         """
-        Adds !'s to the end of the supplied
-        phrase, based upon object init
+        Readies a function to be sent
+        to this backend's workers
 
         Parameters
         ==========
-        phrase: str
-            input phrase
+        f: Callable[..., U]
+            function to send
 
         Returns
         =======
-        str: 
-            resulting excitement
+        Callable[..., U]
+            equivalent function
+        """
+
+        return f
+
+    def map(self, f: Callable[[T], U], items: Iterable[T]) -> list[U]:
+        """
+        Applies f to every item
+
+        Parameters
+        ==========
+        f: Callable[[T], U]
+            what to do to an item
+
+        items: Iterable[T]
+            items upon which to do
+
+        Returns
+        =======
+        list[U]
+            results, in input order
         """
 
-        return f"{phrase}{ '!' * self._n }"
+        return [f(i) for i in items]
+
+    def map_chunks(self, f_chunk: Callable[[list[T]], U], items: Iterable[T]) -> list[U]:
+        """
+        Applies f_chunk to each chunk of
+        (at most) chunksize items
+
+        Parameters
+        ==========
+        f_chunk: Callable[[list[T]], U]
+            what to do to a chunk
+
+        items: Iterable[T]
+            items to chunk
+
+        Returns
+        =======
+        list[U]
+            one result per chunk, in order
+        """
+
+        return [f_chunk(c) for c in _chunked(items, self.chunksize)]
+
+    def close(self) -> None:
+        """Releases any workers (none here)"""
+
+    def __enter__(self) -> 'Backend':
+        """Uses the backend in a with block"""
+
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Closes the backend at the end of a with block"""
+
+        self.close()
 
     def __str__(self) -> str:
         """Human-readable string"""
 
-        return f"Excite({self._n})"
+        return f"{type(self).__name__}(chunksize={self.chunksize})"
 
+class _PoolBackend(Backend):
+    """
+    Backend that sends chunks of items
+    to a concurrent.futures pool; the
+    pool is started on first use and
+    reused until close (or the end of
+    a with block)
+    """
+
+    _executor_type: Callable[..., Executor]
+
+    def __init__(self, max_workers: int | None = None, chunksize: int = 256) -> None:
+        """
+        Initializes pool backend
+
+        Parameters
+        ==========
+        max_workers: int | None
+            pool size (None: executor default)
+
+        chunksize: int
+            items per task sent to the pool
+
+        Raises
+        ======
+        ValueError
+            non-positive chunksize
+        """
+
+        super().__init__(chunksize)
+        self.max_workers: int | None = max_workers
+        self._pool: Executor | None = None
+
+    def map(self, f: Callable[[T], U], items: Iterable[T]) -> list[U]:
+        """
+        Applies f to every item, a chunk
+        per task; a worker's exception is
+        re-raised here as-is
+
+        Parameters
+        ==========
+        f: Callable[[T], U]
+            what to do to an item
+
+        items: Iterable[T]
+            items upon which to do
+
+        Returns
+        =======
+        list[U]
+            results, in input order
+        """
+
+        do_chunk = partial(do_to_all, f=self.prepare(f))
+
+        return [u for chunk in self.map_chunks(do_chunk, items) for u in chunk]
+
+    def map_chunks(self, f_chunk: Callable[[list[T]], U], items: Iterable[T]) -> list[U]:
+        """
+        Applies f_chunk to each chunk of
+        (at most) chunksize items, one
+        chunk per task
+
+        Parameters
+        ==========
+        f_chunk: Callable[[list[T]], U]
+            what to do to a chunk
+
+        items: Iterable[T]
+            items to chunk
+
+        Returns
+        =======
+        list[U]
+            one result per chunk, in order
+        """
+
+        if self._pool is None:
+            self._pool = self._executor_type(max_workers=self.max_workers)
+
+        return list(self._pool.map(self.prepare(f_chunk), _chunked(items, self.chunksize)))
+
+    def close(self) -> None:
+        """Shuts down the pool (a later map starts a new one)"""
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+class ThreadBackend(_PoolBackend):
+    """Thread-pool backend (I/O-bound functions)"""
+
+    _executor_type = ThreadPoolExecutor
+
+class ProcessBackend(_PoolBackend):
+    """
+    Process-pool backend (CPU-bound
+    functions); lambdas and closures
+    are shipped via _PortableFunction
+    """
+
+    _executor_type = ProcessPoolExecutor
+
+    def prepare(self, f: Callable[..., U]) -> Callable[..., U]:
+        """Makes f picklable"""
+
+        return _portable(f)
 
-############################################################
-# 4. Consider the following functions
-# 5. Replace them with list comprehensions
-#    (that still pass the tests)
 ############################################################
 
-def keep_positive(nums: list[int]) -> list[int]:
+def batch_entry(batch: F) -> F:
     """
-    Keeps only positive numbers
+    Marks a function (or method) as a batch
+    entry point: given all the items at once,
+    it does what calling its owner on each
+    would (usable as a decorator)
 
     Parameters
     ==========
-    nums: list[int]
-        input numbers
+    batch: F
+        function of all the items
 
     Returns
     =======
-    list[int]
-        subset that are positive
+    F
+        batch, marked
     """
 
-    result = []
-    for n in nums:
-        if n > 0:
-            result.append(n)
+    # pylint: disable-next=protected-access
+    batch._do_to_all_batch = True  # type: ignore[attr-defined]
 
-    return result
+    return batch
 
-def keep_palindromic(nums: list[int]) -> list[int]:
+def batch_of(f: Callable[[T], U]) -> Callable[[Iterable[T]], list[U]] | None:
     """
-    Keeps only numbers that are the same forward/backward
+    Finds f's batch entry point, if it
+    has one: a batch attribute marked
+    with batch_entry (so, e.g., a batch
+    size setting or a Mock isn't one)
 
     Parameters
     ==========
-    nums: list[int]
-        input numbers
+    f: Callable[[T], U]
+        what to do to an item
 
     Returns
     =======
-    list[int]
-        subset that are palindromic
+    Callable[[Iterable[T]], list[U]] | None
+        f.batch, or None
     """
 
-    result = []
-    for n in nums:
-        if str(n) == str(n)[::-1]:
-            result.append(n)
-
-    return result
+    batch: Any = getattr(f, "batch", None)
+    if callable(batch) and getattr(batch, "_do_to_all_batch", False) is True:
+        return batch
 
-############################################################
-# 6. Abstract!!
-############################################################
+    return None
 
-def keep_if(items: Iterable[T], p: Callable[[T], bool]) -> list[T]:
+def do_to_all(items: Iterable[T], f: Callable[[T], U],
+              backend: Backend | None = None) -> list[U]:
     """
-    Produces the subset of the items
-    that satisfy the predicate
+    Applies a function to all the elements of the input
+    and returns a list of the resulting outputs
 
-    see: filter in Python :)
+    see: map in Python :)
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        items upon which to do
+
+    f: Callable[[T], U]
+        what to do to an item (if it has
+        a batch entry point, that is called
+        once with all the items instead)
+
+    backend: Backend | None
+        where to run f (e.g., a
+        ProcessBackend); None means
+        right here
+
+    Returns
+    =======
+    list[U]
+        list of results
+    """
+
+    if backend is not None:
+        return backend.map(f, items)
+
+    batch: Callable[[Iterable[T]], list[U]] | None = batch_of(f)
+    if batch is not None:
+        return batch(items)
+
+    return [f(i) for i in items]
+
+def _chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """
+    Groups items into lists of
+    (at most) size, lazily
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        items to group
+
+    size: int
+        items per chunk
+
+    Returns
+    =======
+    Iterator[list[T]]
+        chunks, in order
+
+    Raises
+    ======
+    ValueError
+        non-positive size
+    """
+
+    if size < 1:
+        raise ValueError("Must have positive chunk size")
+
+    it: Iterator[T] = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+@overload
+def lazy_do_to_all(items: Iterable[T], f: Callable[[T], U]) -> Iterator[U]: ...
+
+@overload
+def lazy_do_to_all(items: Iterable[T], f: Callable[[T], U],
+                   chunk_size: int) -> Iterator[list[U]]: ...
+
+def lazy_do_to_all(items: Iterable[T], f: Callable[[T], U],
+                   chunk_size: int | None = None) -> Iterator[U] | Iterator[list[U]]:
+    """
+    Lazy version of do_to_all: results
+    are produced as they are asked for,
+    so memory stays constant
+
+    see: map in Python (it's lazy too!)
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        items upon which to do
+
+    f: Callable[[T], U]
+        what to do to an item
+
+    chunk_size: int | None
+        if supplied, yield lists of (at
+        most) this many results at a time
+
+    Returns
+    =======
+    Iterator[U] | Iterator[list[U]]
+        results (or chunks of results)
+
+    Raises
+    ======
+    ValueError
+        non-positive chunk_size
+    """
+
+    if chunk_size is None:
+        return (f(i) for i in items)
+
+    return (do_to_all(chunk, f) for chunk in _chunked(items, chunk_size))
+
+def make_excitement(how_many: int) -> Callable[[str], str]:
+    """
+    Creates a function for adding !'s
+
+    Parameters
+    ==========
+    how_many: int
+        how many !'s to add
+
+    Returns
+    =======
+    Callable[[str], str]:
+        function to excite a supplied string
+
+    Raises
+    ======
+    ValueError
+        supplied negative
+    """
+
+    if how_many < 0:
+        raise ValueError("Must have non-negative excitement")
+
+    suffix: str = how_many * '!'
+
+    def f(phrase: str) -> str:
+        return f"{phrase}{suffix}"
+
+    @batch_entry
+    def batch(phrases: Iterable[str]) -> list[str]:
+        return [p + suffix for p in phrases]
+
+    # batch entry point, which do_to_all looks for
+    f.batch = batch  # type: ignore[attr-defined]
+
+    return f
+    # return lambda phrase: f"{phrase}{ how_many * '!' }"
+
+class Excite(Generic[T]):
+    """
+    Function object for adding !'s
+    """
+
+    __slots__ = ('_n', '_suffix')
+
+    def __init__(self, how_excited: int) -> None:
+        """
+        Initializes Excite object
+
+        Parameters
+        ==========
+        how_excited: int
+            how many !'s to add
+
+        Raises
+        ======
+        ValueError:
+            supplied negative how_excited
+        """
+
+        if how_excited < 0:
+            raise ValueError("Must have non-negative excitement")
+
+        self._n: int = how_excited
+        self._suffix: str = '!' * how_excited
+
+    def __call__(self, phrase: str) -> str:
+        """
+        Adds !'s to the end of the supplied
+        phrase, based upon object init
+
+        Parameters
+        ==========
+        phrase: str
+            input phrase
+
+        Returns
+        =======
+        str: 
+            resulting excitement
+        """
+
+        return f"{phrase}{self._suffix}"
+
+    @batch_entry
+    def batch(self, phrases: Iterable[str]) -> list[str]:
+        """
+        Adds !'s to the end of every
+        phrase (do_to_all calls this
+        instead of one call per phrase)
+
+        Parameters
+        ==========
+        phrases: Iterable[str]
+            input phrases
+
+        Returns
+        =======
+        list[str]
+            resulting excitements
+        """
+
+        suffix: str = self._suffix
+        return [p + suffix for p in phrases]
+
+    def __str__(self) -> str:
+        """Human-readable string"""
+
+        return f"Excite({self._n})"
+
+class Memoize(Generic[T, U]):
+    """
+    Function object that remembers the
+    results of a pure function, so that
+    do_to_all(items, Memoize(f)) calls f
+    once per distinct item (within the
+    cache's size); equal items of different
+    types (1, True, 1.0) are distinct
+    """
+
+    __slots__ = ('_f', '_maxsize', '_cache', 'hits', 'misses', 'uncached')
+
+    def __init__(self, f: Callable[[T], U], maxsize: int | None = 1024) -> None:
+        """
+        Initializes Memoize object
+
+        Parameters
+        ==========
+        f: Callable[[T], U]
+            pure function to remember
+
+        maxsize: int | None
+            most results to keep (least
+            recently used go first); None
+            means no limit
+
+        Raises
+        ======
+        ValueError
+            supplied negative maxsize
+        """
+
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("Must have non-negative maxsize")
+
+        self._f: Callable[[T], U] = f
+        self._maxsize: int | None = maxsize
+        # keyed by (type, item), as 1 == True == 1.0
+        self._cache: OrderedDict[tuple[type, T], U] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.uncached: int = 0
+
+    def __call__(self, item: T) -> U:
+        """
+        Gets f(item), from the cache
+        if possible
+
+        Parameters
+        ==========
+        item: T
+            input (unhashable ones are
+            passed straight to f)
+
+        Returns
+        =======
+        U
+            f(item)
+        """
+
+        key: tuple[type, T] = (type(item), item)
+
+        try:
+            result: U = self._cache[key]
+        except KeyError:
+            self.misses += 1
+
+            result = self._f(item)
+            self._cache[key] = result
+            if self._maxsize is not None and len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+            return result
+        except TypeError:
+            # unhashable
+            self.uncached += 1
+            return self._f(item)
+
+        self.hits += 1
+        self._cache.move_to_end(key)
+
+        return result
+
+    def __len__(self) -> int:
+        """How many results are cached"""
+
+        return len(self._cache)
+
+    def __str__(self) -> str:
+        """Human-readable string"""
+
+        return f"Memoize(hits={self.hits}, misses={self.misses}, uncached={self.uncached})"
+
+
+############################################################
+# 4. Consider the following functions
+# 5. Replace them with list comprehensions
+#    (that still pass the tests)
+############################################################
+
+@overload
+def keep_positive(nums: np.ndarray) -> np.ndarray: ...
+
+@overload
+def keep_positive(nums: list[int]) -> list[int]: ...
+
+def keep_positive(nums: list[int] | np.ndarray) -> list[int] | np.ndarray:
+    """
+    Keeps only positive numbers
+
+    Parameters
+    ==========
+    nums: list[int] | np.ndarray
+        input numbers
+
+    Returns
+    =======
+    list[int] | np.ndarray
+        subset that are positive (an
+        array for array inputs)
+    """
+
+    return keep_if(nums, _is_positive)
+
+@overload
+def keep_palindromic(nums: np.ndarray) -> np.ndarray: ...
+
+@overload
+def keep_palindromic(nums: Iterable[int]) -> list[int]: ...
+
+def keep_palindromic(nums: Iterable[int] | np.ndarray) -> list[int] | np.ndarray:
+    """
+    Keeps only numbers that are the same forward/backward
+
+    Parameters
+    ==========
+    nums: Iterable[int] | np.ndarray
+        input numbers (a step-1 range is
+        never scanned: its palindromes
+        are generated directly; integer
+        arrays are checked arithmetically)
+
+    Returns
+    =======
+    list[int] | np.ndarray
+        subset that are palindromic (an
+        array for array inputs)
+    """
+
+    if isinstance(nums, np.ndarray):
+        # the arithmetic check only knows integers
+        if nums.dtype.kind in 'iu':
+            return keep_if(nums, is_palindromic_array)
+        return keep_if(nums, lambda n: (s := str(n)) == s[::-1])
+
+    if isinstance(nums, range) and nums.step == 1:
+        return list(palindromes_between(nums.start, nums.stop))
+
+    return [n for n in nums if (s := str(n)) == s[::-1]]
+
+############################################################
+# 6. Abstract!!
+############################################################
+
+# predicates known to work on a whole array at
+# once (array of items -> boolean mask)
+MASK_PREDICATES: set[Callable[..., Any]] = set()
+
+def register_mask(p: F) -> F:
+    """
+    Declares that a predicate also works
+    as a vectorized mask function (usable
+    as a decorator); keep_if only calls p
+    on a whole array if it was registered
+
+    Parameters
+    ==========
+    p: F
+        predicate, as passed to keep_if,
+        that also maps an array of items
+        to one bool per item
+
+    Returns
+    =======
+    F
+        p, unchanged
+    """
+
+    MASK_PREDICATES.add(p)
+
+    return p
+
+_is_positive: Callable[[Any], Any] = register_mask(lambda n: n > 0)
+
+def _as_mask(items: np.ndarray, p: Callable[[Any], Any]) -> np.ndarray | None:
+    """
+    Uses p as a mask function, if it
+    was registered as one
+
+    Parameters
+    ==========
+    items: np.ndarray
+        items to consider
+
+    p: Callable[[Any], Any]
+        predicate to apply
+
+    Returns
+    =======
+    np.ndarray | None
+        one bool per item, or None if p
+        isn't registered with register_mask
+    """
+
+    # unhashable callables can't have been registered
+    if not isinstance(p, Hashable) or p not in MASK_PREDICATES:
+        return None
+
+    return np.asarray(p(items), dtype=bool)
+
+@register_mask
+def is_palindromic_array(nums: np.ndarray) -> np.ndarray:
+    """
+    Checks which integers read the same
+    forward/backward, by reversing their
+    digits arithmetically (no strings)
+
+    Parameters
+    ==========
+    nums: np.ndarray
+        integers (int64 or narrower)
+
+    Returns
+    =======
+    np.ndarray
+        one bool per number (negatives are
+        never palindromic: "-1" vs "1-")
+    """
+
+    rest: np.ndarray = np.maximum(nums, 0)
+    reversed_: np.ndarray = np.zeros_like(rest)
+
+    # a reversal that overflows wraps negative,
+    # so it can't match (and isn't a palindrome)
+    while (active := rest > 0).any():
+        reversed_ = np.where(active, reversed_ * 10 + rest % 10, reversed_)
+        rest = rest // 10
+
+    return (reversed_ == nums) & (nums >= 0)
+
+def _reverse_digits(n: int) -> int:
+    """
+    Reverses the digits of n >= 0
+
+    Parameters
+    ==========
+    n: int
+        number to reverse
+
+    Returns
+    =======
+    int
+        digits of n, backwards
+    """
+
+    result: int = 0
+    while n:
+        n, d = divmod(n, 10)
+        result = result * 10 + d
+
+    return result
+
+def palindromes_between(start: int, stop: int) -> Iterator[int]:
+    """
+    Generates the palindromic numbers in
+    [start, stop), in order, by mirroring
+    their first halves (so only ~sqrt of
+    the range is ever visited)
+
+    Parameters
+    ==========
+    start: int
+        smallest candidate
+
+    stop: int
+        one past the largest candidate
+
+    Returns
+    =======
+    Iterator[int]
+        palindromes, ascending
+    """
+
+    start = max(start, 0)
+    if start >= stop:
+        return
+
+    for n_digits in range(len(str(start)), len(str(stop - 1)) + 1):
+        half: int = n_digits // 2
+        scale: int = 10 ** half
+
+        # the first ceil(n_digits / 2) digits, mirrored
+        first: int = 0 if n_digits == 1 else 10 ** (n_digits - half - 1)
+        for prefix in range(max(first, start // scale), 10 ** (n_digits - half)):
+            pal: int = prefix * scale + _reverse_digits(prefix // 10 ** (n_digits % 2))
+
+            if pal >= stop:
+                return
+            if pal >= start:
+                yield pal
+
+@overload
+def keep_if(items: np.ndarray, p: Callable[[Any], Any],
+            backend: Backend | None = None) -> np.ndarray: ...
+
+@overload
+def keep_if(items: Iterable[T], p: Callable[[T], bool],
+            backend: Backend | None = None) -> list[T]: ...
+
+def keep_if(items: Iterable[T] | np.ndarray, p: Callable[[Any], Any],
+            backend: Backend | None = None) -> list[T] | np.ndarray:
+    """
+    Produces the subset of the items
+    that satisfy the predicate
+
+    see: filter in Python :)
+
+    Parameters
+    ==========
+    items: Iterable[T] | np.ndarray
+        items to consider
+
+    p: Callable[[T], bool]
+        predicate to apply
+
+    backend: Backend | None
+        where to run p; None means
+        right here
+
+    Return
+    ======
+    list[T] | np.ndarray:
+        those items for which
+        p returns True (an array for
+        array inputs; if p was registered
+        with register_mask, it's called
+        once on the whole array)
+    """
+
+    if isinstance(items, np.ndarray):
+        mask: np.ndarray | None = _as_mask(items, p)
+        if mask is None:
+            flags: Iterable[bool] = map(p, items) if backend is None else backend.map(p, items)
+            mask = np.fromiter(flags, dtype=bool, count=len(items))
+
+        return items[mask]
+
+    if backend is not None:
+        items = list(items)
+        return [i for i, keep in zip(items, backend.map(p, items)) if keep]
+
+    return [i for i in items if p(i)]
+
+
+############################################################
+# 7. Consider the following functions - abstract!!
+# 8. For an extra challenge, can you come up with a
+#    way to use your new abstraction to implement
+#    your last two?
+############################################################
+
+def _naive_sum(nums: Iterable[float]) -> float:
+    """
+    Sums left to right with +=: the
+    fastest loop, but each addition's
+    rounding error accumulates (~n)
+
+    Parameters
+    ==========
+    nums: Iterable[float]
+        numbers to sum
+
+    Returns
+    =======
+    float
+        sum (exact for ints)
+    """
+
+    result: float = 0
+
+    for n in nums:
+        result += n
+
+    return result
+
+# below this many values, pairwise summation just loops
+PAIRWISE_BLOCK: int = 128
+
+def _pairwise_sum(nums: Iterable[float]) -> float:
+    """
+    Sums each half recursively, then
+    adds the halves, so rounding error
+    grows ~log n rather than ~n
+
+    Parameters
+    ==========
+    nums: Iterable[float]
+        numbers to sum (copied to a
+        list unless already one)
+
+    Returns
+    =======
+    float
+        sum
+    """
+
+    vals: list[float] = nums if isinstance(nums, list) else list(nums)
+
+    def sum_range(lo: int, hi: int) -> float:
+        if hi - lo <= PAIRWISE_BLOCK:
+            return _naive_sum(vals[lo:hi])
+
+        mid: int = (lo + hi) // 2
+        return sum_range(lo, mid) + sum_range(mid, hi)
+
+    return sum_range(0, len(vals))
+
+def _kahan_sum(nums: Iterable[float]) -> float:
+    """
+    Sums with compensation (Kahan-Babuska/
+    Neumaier): the bits each addition
+    rounds away are kept and added back
+
+    Parameters
+    ==========
+    nums: Iterable[float]
+        numbers to sum
+
+    Returns
+    =======
+    float
+        sum, with error that doesn't
+        grow with n
+    """
+
+    result: float = 0.0
+    compensation: float = 0.0
+
+    for n in nums:
+        total: float = result + n
+
+        # recover the low-order bits lost in the addition
+        if abs(result) >= abs(n):
+            compensation += (result - total) + n
+        else:
+            compensation += (n - total) + result
+
+        result = total
+
+    return result + compensation
+
+def _numpy_sum(nums: Iterable[float]) -> float:
+    """
+    Sums with np.sum (pairwise, in C)
+
+    Parameters
+    ==========
+    nums: Iterable[float]
+        numbers to sum (arrays and
+        buffers are used without copying
+        into a list)
+
+    Returns
+    =======
+    float
+        sum
+    """
+
+    arr: np.ndarray = nums if isinstance(nums, np.ndarray) else np.asarray(
+        nums if isinstance(nums, (memoryview, array.array)) else list(nums)
+    )
+
+    return np.sum(arr).item()
+
+# on 10^6 mixed-magnitude floats (L12_benchmark.py), roughly:
+# numpy on an array is ~50x faster than any list loop; naive is the
+# fastest loop but the least accurate; pairwise matches numpy's
+# accuracy; kahan and exact are (near-)exact but 3-4x slower
+SUM_STRATEGIES: dict[str, Callable[[Iterable[float]], float]] = {
+    "numpy": _numpy_sum,
+    "naive": _naive_sum,
+    "pairwise": _pairwise_sum,
+    "kahan": _kahan_sum,
+    "exact": math.fsum,
+}
+
+def my_sum(nums: Iterable[float], strategy: str | None = None) -> float:
+    """
+    Adds all the numbers
+    in the list
+
+    Parameters
+    ==========
+    nums: Iterable[float]
+        numbers to sum
+
+    strategy: str | None
+        one of SUM_STRATEGIES:
+        - "naive": += loop (exact for ints)
+        - "pairwise": halves, recursively
+        - "kahan": compensated loop
+        - "exact": math.fsum (correctly rounded)
+        - "numpy": np.sum
+        None means "numpy" for arrays and
+        typed buffers, else "naive"
+
+    Returns
+    =======
+    float
+        sum of the numbers
+
+    Raises
+    ======
+    ValueError
+        unknown strategy
+    """
+
+    if strategy is None:
+        strategy = "numpy" if isinstance(nums, (np.ndarray, memoryview, array.array)) else "naive"
+
+    if strategy not in SUM_STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    return SUM_STRATEGIES[strategy](nums)
+
+def my_len(items: Iterable[T]) -> int:
+    """
+    Counts the items in the list
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        (sized containers are O(1))
+
+    Returns
+    =======
+    int
+        how many?
+    """
+
+    if isinstance(items, Sized):
+        return len(items)
+
+    result: int = 0
+
+    for _ in items:
+        result += 1
+
+    return result
+
+class TermMatcher:
+    """
+    Case-insensitive matching of whole
+    phrases against a set of terms (any_dftba,
+    for many terms at once): terms are
+    case-folded once into a hash set, so
+    each phrase is one fold + one lookup
+    """
+
+    __slots__ = ('_terms',)
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        """
+        Initializes TermMatcher object
+
+        Parameters
+        ==========
+        terms: Iterable[str]
+            terms to look for
+
+        Raises
+        ======
+        ValueError
+            no terms supplied
+        """
+
+        self._terms: frozenset[str] = frozenset(t.casefold() for t in terms)
+
+        if not self._terms:
+            raise ValueError("Must supply at least one term")
+
+    def match(self, phrase: str) -> str | None:
+        """
+        Finds the term a phrase matches
+
+        Parameters
+        ==========
+        phrase: str
+            input phrase
+
+        Returns
+        =======
+        str | None
+            matching (case-folded) term,
+            if any
+        """
+
+        folded: str = phrase.casefold()
+
+        return folded if folded in self._terms else None
+
+    def any(self, phrases: Iterable[str]) -> bool:
+        """
+        Determines if any phrase matches
+        (stops at the first match)
+
+        Parameters
+        ==========
+        phrases: Iterable[str]
+            input phrases
+
+        Returns
+        =======
+        bool
+            is some term found?
+        """
+
+        terms: frozenset[str] = self._terms
+
+        return combine(phrases, lambda found, p: found or p.casefold() in terms, False,
+                       absorbing=True)
+
+    def all(self, phrases: Iterable[str]) -> bool:
+        """
+        Determines if every phrase matches
+        (stops at the first non-match)
+
+        Parameters
+        ==========
+        phrases: Iterable[str]
+            input phrases
+
+        Returns
+        =======
+        bool
+            is every phrase a term?
+        """
+
+        terms: frozenset[str] = self._terms
+
+        return combine(phrases, lambda ok, p: ok and p.casefold() in terms, True,
+                       absorbing=False)
+
+    def which(self, phrases: Iterable[str]) -> set[str]:
+        """
+        Finds the terms that appear (stops
+        once every term has been seen)
+
+        Parameters
+        ==========
+        phrases: Iterable[str]
+            input phrases
+
+        Returns
+        =======
+        set[str]
+            (case-folded) terms found
+        """
+
+        terms: frozenset[str] = self._terms
+
+        def note(found: set[str], p: str) -> set[str] | Stop[set[str]]:
+            folded: str = p.casefold()
+            if folded in terms:
+                found.add(folded)
+                if len(found) == len(terms):
+                    return Stop(found)
+            return found
+
+        return combine(phrases, note, set())
+
+    def count(self, phrases: Iterable[str]) -> dict[str, int]:
+        """
+        Counts the matches of each term
+
+        Parameters
+        ==========
+        phrases: Iterable[str]
+            input phrases
+
+        Returns
+        =======
+        dict[str, int]
+            (case-folded) term -> how many
+            phrases matched it (found terms only)
+        """
+
+        terms: frozenset[str] = self._terms
+        counts: dict[str, int] = {}
+
+        for p in phrases:
+            folded: str = p.casefold()
+            if folded in terms:
+                counts[folded] = counts.get(folded, 0) + 1
+
+        return counts
+
+    def __len__(self) -> int:
+        """How many terms"""
+
+        return len(self._terms)
+
+_DFTBA: TermMatcher = TermMatcher(["dftba"])
+
+def any_dftba(phrases: Iterable[str]) -> bool:
+    """
+    Determines if any of
+    the phrases are
+    "dftba" (case-insensitive)
+
+    see: any/all in Python :)
+
+    Parameters
+    ==========
+    phrases: Iterable[str]
+        input phrases (stops reading
+        at the first match)
+
+    Returns
+    =======
+    bool:
+        is "dftba" found in any case?
+    """
+
+    return _DFTBA.any(phrases)
+
+@dataclass(frozen=True)
+class Stop(Generic[U]):
+    """
+    Final result of an accumulation:
+    returned by combine's function
+    to stop early
+
+    Attributes
+    ==========
+    value: U
+        result combine should return
+    """
+
+    value: U
+
+    def __str__(self) -> str:
+        """Human-readable string"""
+
+        return f"Stop({self.value!r})"
+
+# "no absorbing value declared" (None is a fine absorbing value)
+_NO_ABSORBING: Any = object()
+
+class Monoid(Generic[T]):
+    """
+    Function object for an associative
+    combining function with an identity
+    value; combine can reduce these
+    in parallel
+    """
+
+    def __init__(self, op: Callable[[T, T], T], identity: T) -> None:
+        """
+        Initializes Monoid object
+
+        Parameters
+        ==========
+        op: Callable[[T, T], T]
+            associative combining function
+
+        identity: T
+            value such that op(identity, x)
+            == op(x, identity) == x
+        """
+
+        self.op: Callable[[T, T], T] = op
+        self.identity: T = identity
+
+    def __call__(self, acc: T, val: T) -> T:
+        """
+        Combines two values
+
+        Parameters
+        ==========
+        acc: T
+            prior result
+
+        val: T
+            next value
+
+        Returns
+        =======
+        T
+            op(acc, val)
+        """
+
+        return self.op(acc, val)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickles (lambda ops included) for worker processes"""
+
+        return (Monoid, (_portable(self.op), self.identity))
+
+    def __str__(self) -> str:
+        """Human-readable string"""
+
+        return f"Monoid({self.identity!r})"
+
+def _fold(m: Monoid[T], chunk: list[T]) -> T:
+    """
+    Reduces one chunk (runs in a worker)
+
+    Parameters
+    ==========
+    m: Monoid[T]
+        how to combine
+
+    chunk: list[T]
+        values to reduce
+
+    Returns
+    =======
+    T
+        combination of the chunk
+    """
+
+    return reduce(m, chunk, m.identity)
+
+def _merge_tree(m: Monoid[T], partials: list[T], init: T) -> T:
+    """
+    Combines per-chunk results,
+    neighbours pairwise, as a tree
+
+    Parameters
+    ==========
+    m: Monoid[T]
+        how to combine
+
+    partials: list[T]
+        per-chunk results, in order
+
+    init: T
+        result to start with
+
+    Returns
+    =======
+    T
+        init combined with all partials
+    """
+
+    # keeping order is all associativity
+    # needs (not commutativity)
+    while len(partials) > 1:
+        partials = [
+            m(*partials[i:i + 2]) if i + 1 < len(partials) else partials[i]
+            for i in range(0, len(partials), 2)
+        ]
+
+    return m(init, partials[0]) if partials else init
+
+def combine(items: Iterable[T], f: Callable[[U, T], U | Stop[U]], init: U,
+            backend: Backend | None = None, absorbing: U = _NO_ABSORBING) -> U:
+    """
+    Abstraction over accumulator
+    pattern
+
+    see: functools.reduce, itertools.accumulate :)
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        items to process
+
+    f: Callable[[U, T], U | Stop[U]]
+        function that can process
+        a single item with a prior
+        result (returning Stop(result)
+        ends the accumulation there)
+
+    init: U
+        result to start with
+
+    backend: Backend | None
+        if f is a Monoid, reduce chunks
+        here and merge them as a tree
+        (other functions always run
+        serially, left to right)
+
+    absorbing: U
+        value that f can never change
+        once reached (e.g., True for or);
+        reaching it stops the serial
+        accumulation early
+
+    Returns
+    =======
+    U
+        result of accumulation
+    """
+
+    if backend is not None and isinstance(f, Monoid):
+        return _merge_tree(f, backend.map_chunks(partial(_fold, f), items), init)
+
+    result: U = init
+    absorbs: bool = absorbing is not _NO_ABSORBING
+
+    if absorbs and result == absorbing:
+        return result
+
+    for i in items:
+        step: U | Stop[U] = f(result, i)
+
+        if isinstance(step, Stop):
+            return step.value
+
+        result = step
+        if absorbs and result == absorbing:
+            break
+
+    return result
+
+def _save_checkpoint(path: str, offset: int, acc: Any) -> None:
+    """
+    Atomically saves scan progress
+
+    Parameters
+    ==========
+    path: str
+        checkpoint file
+
+    offset: int
+        how many items have been consumed
+
+    acc: Any
+        accumulation after those items
+    """
+
+    tmp: str = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((offset, acc), f)
+
+    # a crash mid-write leaves the old checkpoint intact
+    os.replace(tmp, path)
+
+def scan(items: Iterable[T], f: Callable[[U, T], U], init: U,
+         checkpoint: str | None = None, every: int = 1000) -> Iterator[U]:
+    """
+    Running version of combine: yields
+    every accumulation along the way,
+    optionally checkpointing to disk so
+    a crashed run can resume
+
+    see: itertools.accumulate (with initial) :)
+
+    Parameters
+    ==========
+    items: Iterable[T]
+        items to process (to resume, they
+        must be the same items again, e.g.
+        a re-opened file)
+
+    f: Callable[[U, T], U]
+        function that can process
+        a single item with a prior
+        result
+
+    init: U
+        result to start with
+
+    checkpoint: str | None
+        file for (items consumed, result)
+        pairs; if it exists, the scan
+        resumes from it, and it is removed
+        once the scan completes
+
+    every: int
+        items between checkpoints
+
+    Returns
+    =======
+    Iterator[U]
+        init, then the result after each
+        item; when resuming from a
+        checkpoint after m items, starts
+        with the result after item m
+
+    Raises
+    ======
+    ValueError
+        non-positive every
+    """
+
+    if every < 1:
+        raise ValueError("Must checkpoint every positive number of items")
+
+    offset: int = 0
+    result: U = init
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint, "rb") as cp:
+            offset, result = pickle.load(cp)
+
+    it: Iterator[T] = islice(items, offset, None)
+
+    yield result
+
+    for i in it:
+        result = f(result, i)
+        offset += 1
+
+        if checkpoint is not None and offset % every == 0:
+            _save_checkpoint(checkpoint, offset, result)
+
+        yield result
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+class RunningCombine(Generic[T, U]):
+    """
+    Keeps combine(items, f, init) up to
+    date as items are added/removed,
+    in O(1) per change
+    """
+
+    def __init__(self, f: Callable[[U, T], U], init: U,
+                 inverse: Callable[[U, T], U] | None = None) -> None:
+        """
+        Initializes RunningCombine object
+
+        Parameters
+        ==========
+        f: Callable[[U, T], U]
+            function that can process
+            a single item with a prior
+            result
+
+        init: U
+            result to start with
+
+        inverse: Callable[[U, T], U] | None
+            undoes f (inverse(f(acc, x), x)
+            == acc, and f must not care about
+            order, e.g., + and -); without it,
+            items can't be removed
+        """
+
+        self._f: Callable[[U, T], U] = f
+        self._inverse: Callable[[U, T], U] | None = inverse
+        self._count: int = 0
+
+        self.result: U = init
+
+    def add(self, item: T) -> None:
+        """
+        Includes another item
+
+        Parameters
+        ==========
+        item: T
+            item to include
+        """
+
+        self.result = self._f(self.result, item)
+        self._count += 1
+
+    def remove(self, item: T) -> None:
+        """
+        Excludes a previously added item
+
+        Parameters
+        ==========
+        item: T
+            item to exclude
+
+        Raises
+        ======
+        ValueError
+            no inverse, or nothing to remove
+        """
+
+        if self._inverse is None:
+            raise ValueError("Must supply inverse to remove (see SegmentCombine)")
+
+        if not self._count:
+            raise ValueError("Nothing to remove")
+
+        self.result = self._inverse(self.result, item)
+        self._count -= 1
+
+    def __len__(self) -> int:
+        """How many items are included"""
+
+        return self._count
+
+class SegmentCombine(Generic[T]):
+    """
+    Keeps combine(items, m, init) up to
+    date for a Monoid without an inverse
+    (e.g., max, or string +), in O(log n)
+    per change, using a segment tree;
+    removed items' leaves are reclaimed
+    once they outnumber the live ones
+    """
+
+    def __init__(self, m: Monoid[T], init: T) -> None:
+        """
+        Initializes SegmentCombine object
+
+        Parameters
+        ==========
+        m: Monoid[T]
+            how to combine
+
+        init: T
+            result to start with
+        """
+
+        self._m: Monoid[T] = m
+        self._init: T = init
+        self._removed: int = 0
+        self._next_handle: int = 0
+
+        # handle -> leaf, for the live items only; both
+        # only ever increase, so this is in leaf order
+        self._positions: dict[int, int] = {}
+
+        # node i combines nodes 2i and 2i + 1 (in order);
+        # the leaves, _capacity onwards, are the items
+        self._capacity: int = 1
+        self._tree: list[T] = [m.identity] * 2
+
+    def _build(self, leaves: list[T], capacity: int) -> None:
+        """Rebuilds the whole tree from its leaves (O(capacity))"""
+
+        self._capacity = capacity
+        self._tree = [self._m.identity] * capacity + leaves \
+            + [self._m.identity] * (capacity - len(leaves))
+        for i in range(capacity - 1, 0, -1):
+            self._tree[i] = self._m(self._tree[2 * i], self._tree[2 * i + 1])
+
+    def _grow(self) -> None:
+        """Doubles the capacity (amortized O(1) per add)"""
+
+        self._build(self._tree[self._capacity:], 2 * self._capacity)
+
+    def _compact(self) -> None:
+        """
+        Drops the removed items' leaves, keeping the
+        live ones in order (amortized O(1) per remove,
+        as at least half the leaves are removed ones)
+        """
+
+        leaves: list[T] = [self._tree[self._capacity + p] for p in self._positions.values()]
+        self._positions = {h: p for p, h in enumerate(self._positions)}
+        self._removed = 0
+
+        capacity: int = 1
+        while capacity < len(leaves):
+            capacity *= 2
+
+        self._build(leaves, capacity)
+
+    def _set(self, position: int, value: T) -> None:
+        """Sets a leaf and fixes its ancestors"""
+
+        i: int = self._capacity + position
+        self._tree[i] = value
+
+        while i > 1:
+            i //= 2
+            self._tree[i] = self._m(self._tree[2 * i], self._tree[2 * i + 1])
+
+    def add(self, item: T) -> int:
+        """
+        Includes another item (after
+        all the others)
+
+        Parameters
+        ==========
+        item: T
+            item to include
+
+        Returns
+        =======
+        int
+            handle for removing it later
+        """
+
+        # leaves in use, whether live or removed
+        size: int = len(self._positions) + self._removed
+        if size == self._capacity:
+            self._grow()
+
+        self._set(size, item)
+        self._positions[self._next_handle] = size
+        self._next_handle += 1
+
+        return self._next_handle - 1
+
+    def remove(self, handle: int) -> None:
+        """
+        Excludes a previously added item
+
+        Parameters
+        ==========
+        handle: int
+            what add returned
+
+        Raises
+        ======
+        ValueError
+            unknown (or already removed) handle
+        """
+
+        if handle not in self._positions:
+            raise ValueError("Unknown handle")
+
+        self._set(self._positions.pop(handle), self._m.identity)
+        self._removed += 1
+
+        if self._removed > len(self._positions):
+            self._compact()
+
+    @property
+    def result(self) -> T:
+        """combine of the included items"""
+
+        return self._m(self._init, self._tree[1])
+
+    def __len__(self) -> int:
+        """How many items are included"""
+
+        return len(self._positions)
+
+############################################################
+# (Async versions: for I/O-bound coroutine functions)
+############################################################
+
+async def _aiter_of(items: Iterable[T] | AsyncIterable[T]) -> AsyncGenerator[T, None]:
+    """
+    Iterates sync or async items, asynchronously
+    (closing items, if it is an async generator,
+    when closed itself)
+
+    Parameters
+    ==========
+    items: Iterable[T] | AsyncIterable[T]
+        items to iterate
+
+    Returns
+    =======
+    AsyncGenerator[T, None]
+        the same items
+    """
+
+    if isinstance(items, AsyncIterable):
+        try:
+            async for i in items:
+                yield i
+        finally:
+            if isinstance(items, AsyncGenerator):
+                await items.aclose()
+    else:
+        for i in items:
+            yield i
+
+async def async_do_to_all(items: Iterable[T] | AsyncIterable[T],
+                          f: Callable[[T], Awaitable[U]],
+                          limit: int = 8, ordered: bool = True) -> AsyncGenerator[U, None]:
+    """
+    Async version of do_to_all: runs up to
+    limit calls of a coroutine function at
+    once, reading the next item only when
+    there is room (backpressure)
+
+    Parameters
+    ==========
+    items: Iterable[T] | AsyncIterable[T]
+        items upon which to do
+
+    f: Callable[[T], Awaitable[U]]
+        what to do to an item
+
+    limit: int
+        most items in flight at once
+        (including finished ones waiting
+        for their turn, when ordered)
+
+    ordered: bool
+        True yields results in input order,
+        False as soon as each finishes
+
+    Returns
+    =======
+    AsyncGenerator[U, None]
+        results
+
+    Raises
+    ======
+    ValueError
+        non-positive limit
+    """
+
+    if limit < 1:
+        raise ValueError("Must have positive limit")
+
+    source: AsyncGenerator[T, None] = _aiter_of(items)
+    pending: deque[asyncio.Future[U]] = deque()
+    exhausted: bool = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    item: T = await anext(source)
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.append(asyncio.ensure_future(f(item)))
+
+            if not pending:
+                return
+
+            if ordered:
+                yield await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    pending.remove(fut)
+                for fut in done:
+                    yield fut.result()
+    finally:
+        # an error (or the caller stopping early)
+        # shouldn't leave work (or the source) running
+        for fut in pending:
+            fut.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await source.aclose()
+
+async def async_keep_if(items: Iterable[T] | AsyncIterable[T],
+                        p: Callable[[T], Awaitable[bool]],
+                        limit: int = 8, ordered: bool = True) -> AsyncGenerator[T, None]:
+    """
+    Async version of keep_if (see
+    async_do_to_all)
+
+    Parameters
+    ==========
+    items: Iterable[T] | AsyncIterable[T]
+        items to consider
+
+    p: Callable[[T], Awaitable[bool]]
+        predicate to apply
+
+    limit: int
+        most predicates in flight at once
+
+    ordered: bool
+        True yields items in input order,
+        False as soon as each is checked
+
+    Returns
+    =======
+    AsyncGenerator[T, None]
+        those items for which
+        p returns True
+
+    Raises
+    ======
+    ValueError
+        non-positive limit
+    """
+
+    async def check(item: T) -> tuple[T, bool]:
+        return item, await p(item)
+
+    checked: AsyncGenerator[tuple[T, bool], None] = async_do_to_all(items, check, limit, ordered)
+
+    try:
+        async for item, keep in checked:
+            if keep:
+                yield item
+    finally:
+        await checked.aclose()
+
+
+############################################################
+# 9. Put them all together (without the in-between lists)
+############################################################
+
+def _timed(f: Callable[..., U], timings: dict[str, float], name: str) -> Callable[..., U]:
+    """
+    Wraps f to add its running time
+    to timings[name]
+
+    Parameters
+    ==========
+    f: Callable[..., U]
+        function to time
+
+    timings: dict[str, float]
+        seconds per stage (updated)
+
+    name: str
+        stage name
+
+    Returns
+    =======
+    Callable[..., U]
+        timed version of f
+    """
+
+    timings.setdefault(name, 0.0)
+
+    def timed_f(*args: Any) -> U:
+        start: float = time.perf_counter()
+        try:
+            return f(*args)
+        finally:
+            timings[name] += time.perf_counter() - start
+
+    return timed_f
+
+def _run_stages(stages: list[tuple[str, Callable[[Any], Any]]], items: Iterable[Any],
+                timings: dict[str, float] | None = None) -> Iterator[Any]:
+    """
+    Chains map/filter stages lazily,
+    so each item flows through all of
+    them before the next is read
+
+    Parameters
+    ==========
+    stages: list[tuple[str, Callable[[Any], Any]]]
+        ("map" | "filter", function) pairs
+
+    items: Iterable[Any]
+        source items
+
+    timings: dict[str, float] | None
+        if supplied, seconds per stage
+        are added here
+
+    Returns
+    =======
+    Iterator[Any]
+        outputs of the last stage
+    """
+
+    it: Iterator[Any] = iter(items)
+
+    for idx, (kind, fn) in enumerate(stages):
+        if timings is not None:
+            fn = _timed(fn, timings, f"{idx}:{kind}:{getattr(fn, '__name__', fn)}")
+
+        it = map(fn, it) if kind == "map" else filter(fn, it)
+
+    return it
+
+def _run_chunk(stages: list[tuple[str, Callable[[Any], Any]]], profile: bool,
+               fold: Monoid[Any] | None, chunk: list[Any]) -> tuple[Any, dict[str, float]]:
+    """
+    Runs the stages over one chunk
+    (in a worker)
+
+    Parameters
+    ==========
+    stages: list[tuple[str, Callable[[Any], Any]]]
+        ("map" | "filter", function) pairs
+
+    profile: bool
+        time the stages?
+
+    fold: Monoid[Any] | None
+        if supplied, reduce the outputs too
+
+    chunk: list[Any]
+        source items
+
+    Returns
+    =======
+    tuple[Any, dict[str, float]]
+        outputs (a list, or their fold)
+        and seconds per stage
+    """
+
+    timings: dict[str, float] = {}
+    outputs: Iterator[Any] = _run_stages(stages, chunk, timings if profile else None)
+
+    if fold is None:
+        return list(outputs), timings
+
+    start: float = time.perf_counter()
+    result: Any = reduce(fold, outputs, fold.identity)
+    if profile:
+        timings["reduce"] = time.perf_counter() - start
+
+    return result, timings
+
+class Pipeline(Generic[T]):
+    """
+    Builder for do_to_all/keep_if/combine
+    chains that runs them as one pass:
+
+    Pipeline(xs).map(f).filter(p).reduce(g, init)
+    == combine(keep_if(do_to_all(xs, f), p), g, init)
+    """
+
+    def __init__(self, items: Iterable[T], backend: Backend | None = None,
+                 profile: bool = False) -> None:
+        """
+        Initializes Pipeline object
+
+        Parameters
+        ==========
+        items: Iterable[T]
+            source items (read once)
+
+        backend: Backend | None
+            where to run the stages (chunk
+            by chunk); None means streaming,
+            right here
+
+        profile: bool
+            record seconds per stage in
+            timings (costs a little per call)
+        """
+
+        self._items: Iterable[T] = items
+        self._backend: Backend | None = backend
+        self._profile: bool = profile
+        self._stages: list[tuple[str, Callable[[Any], Any]]] = []
+
+        self.timings: dict[str, float] = {}
+
+    def map(self, f: Callable[[T], U]) -> 'Pipeline[U]':
+        """
+        Adds a do_to_all stage
+
+        Parameters
+        ==========
+        f: Callable[[T], U]
+            what to do to an item
 
-    Parameters
-    ==========
-    items: Iterable[T]
-        items to consider
+        Returns
+        =======
+        Pipeline[U]
+            this pipeline
+        """
 
-    p: Callable[[T], bool]
-        predicate to apply
+        self._stages.append(("map", f))
+        return self  # type: ignore[return-value]
 
-    Return
-    ======
-    list[T]:
-        those items for which
-        p returns True
-    """
+    def filter(self, p: Callable[[T], bool]) -> 'Pipeline[T]':
+        """
+        Adds a keep_if stage
 
-    return [i for i in items if p(i)]
+        Parameters
+        ==========
+        p: Callable[[T], bool]
+            predicate to apply
 
+        Returns
+        =======
+        Pipeline[T]
+            this pipeline
+        """
 
-############################################################
-# 7. Consider the following functions - abstract!!
-# 8. For an extra challenge, can you come up with a
-#    way to use your new abstraction to implement
-#    your last two?
-############################################################
+        self._stages.append(("filter", p))
+        return self
 
-def my_sum(nums: list[int]) -> int:
-    """
-    Adds all the numbers
-    in the list
+    def __iter__(self) -> Iterator[T]:
+        """
+        Streams the outputs (ignores
+        the backend)
 
-    Parameters
-    ==========
-    nums: list[int]
-        numbers to sum
+        Returns
+        =======
+        Iterator[T]
+            outputs, one at a time
+        """
 
-    Returns
-    =======
-    int
-        sum of the numbers
-    """
+        return _run_stages(self._stages, self._items, self.timings if self._profile else None)
 
-    result: int = 0
+    def stream(self, chunk_size: int) -> Iterator[list[T]]:
+        """
+        Streams the outputs in lists
 
-    for n in nums:
-        result += n
+        Parameters
+        ==========
+        chunk_size: int
+            outputs per list
 
-    return result
+        Returns
+        =======
+        Iterator[list[T]]
+            chunks of outputs
 
-def my_len(items: list[T]) -> int:
-    """
-    Counts the items in the list
+        Raises
+        ======
+        ValueError
+            non-positive chunk_size
+        """
 
-    Parameters
-    ==========
-    items: list[T]
+        return _chunked(iter(self), chunk_size)
 
-    Returns
-    =======
-    int
-        how many?
-    """
+    def _run_chunks(self, fold: Monoid[Any] | None) -> list[Any]:
+        """
+        Runs the stages on the backend
 
-    result: int = 0
+        Parameters
+        ==========
+        fold: Monoid[Any] | None
+            if supplied, each chunk is
+            reduced in its worker too
 
-    for _ in items:
-        result += 1
+        Returns
+        =======
+        list[Any]
+            per-chunk results, in order
+        """
 
-    return result
+        assert self._backend is not None
 
-def any_dftba(phrases: list[str]) -> bool:
-    """
-    Determines if any of
-    the phrases are
-    "dftba" (case-insensitive)
+        stages = [(kind, self._backend.prepare(fn)) for kind, fn in self._stages]
+        results = self._backend.map_chunks(
+            partial(_run_chunk, stages, self._profile, fold), self._items
+        )
 
-    see: any/all in Python :)
+        for _, chunk_timings in results:
+            for name, seconds in chunk_timings.items():
+                self.timings[name] = self.timings.get(name, 0.0) + seconds
 
-    Parameters
-    ==========
-    phrases: list[str]
-        input phrases
+        return [value for value, _ in results]
 
-    Returns
-    =======
-    bool:
-        is "dftba" found in any case?
-    """
+    def collect(self) -> list[T]:
+        """
+        Gathers all the outputs
 
-    result: bool = False
+        Returns
+        =======
+        list[T]
+            outputs, in input order
+        """
 
-    for p in phrases:
-        if p.lower() == "dftba":
-            result = True
+        if self._backend is None:
+            return list(self)
 
-    return result
+        return [out for chunk in self._run_chunks(None) for out in chunk]
 
-def combine(items: Iterable[T], f: Callable[[U, T], U], init: U) -> U:
-    """
-    Abstraction over accumulator
-    pattern
+    def reduce(self, g: Callable[[U, T], U | Stop[U]], init: U,
+               absorbing: U = _NO_ABSORBING) -> U:
+        """
+        Combines the outputs (see combine)
 
-    see: functools.reduce, itertools.accumulate :)
+        Parameters
+        ==========
+        g: Callable[[U, T], U | Stop[U]]
+            function that can process
+            a single output with a prior
+            result; a Monoid is reduced
+            in the backend's workers
 
-    Parameters
-    ==========
-    items: Iterable[T]
-        items to process
+        init: U
+            result to start with
 
-    f: Callable[[U, T], U]
-        function that can process
-        a single item with a prior
-        result
+        absorbing: U
+            see combine (streaming only)
 
-    init: U
-        result to start with
+        Returns
+        =======
+        U
+            result of accumulation
+        """
 
-    Returns
-    =======
-    U
-        result of accumulation
-    """
+        if self._backend is not None and isinstance(g, Monoid):
+            return _merge_tree(g, self._run_chunks(g), init)
 
-    result: U = init
+        outputs: Iterable[T] = self if self._backend is None else self.collect()
+        if self._profile:
+            g = _timed(g, self.timings, "reduce")
 
-    for i in items:
-        result = f(result, i)
+        return combine(outputs, g, init, absorbing=absorbing)
 
-    return result
 
 ############################################################
 ############################################################
 
-class TestPattern(unittest.TestCase):
+class TestPattern(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """Tests ALL the patterns"""
 
     def test_excite(self) -> None:
@@ -430,6 +2623,27 @@ class TestPattern(unittest.TestCase):
         self.assertEqual(how_long([]), [])
         self.assertEqual(how_long(['', 'a', 'bb', 'ccc']), ['0 long', '1 long', '2 long', '3 long'])
 
+    def test_column_kernels(self) -> None:
+        """Tests column versions against list versions"""
+
+        phrases: list[str] = ['', 'a', 'bb', 'ccc', 'straße', 'Ünïcode']
+
+        for list_f, column_f in COLUMN_VERSIONS:
+            with self.subTest(f=list_f.__name__):
+                expected: list[str] = list_f(phrases)
+
+                for column in (np.array(phrases), np.array(phrases, dtype=STRING_DTYPE)):
+                    actual = column_f(column)
+                    self.assertEqual(actual.dtype.kind, column.dtype.kind)
+                    self.assertEqual(actual.tolist(), expected)
+
+                series: pd.Series = pd.Series(phrases, index=range(10, 16))
+                actual_series = column_f(series)
+                self.assertEqual(actual_series.tolist(), expected)
+                self.assertEqual(actual_series.index.tolist(), list(range(10, 16)))
+
+                self.assertEqual(column_f(np.array([], dtype=str)).tolist(), [])
+
     ###
 
     def test_do_to_all(self) -> None:
@@ -479,6 +2693,180 @@ class TestPattern(unittest.TestCase):
             list(map(str.upper, input_phrases))
         )
 
+    def test_memoize(self) -> None:
+        """Tests do_to_all with Memoize"""
+
+        with self.assertRaises(ValueError):
+            Memoize(len, maxsize=-1)
+
+        calls: list[Any] = []
+        def slow_len(item: Any) -> int:
+            calls.append(item)
+            return len(item)
+
+        input_phrases = ['a', 'bb', 'a', 'ccc', 'bb', 'a', ['x', 'y'], ['x', 'y']]
+        memo: Memoize[Any, int] = Memoize(slow_len)
+
+        self.assertEqual(do_to_all(input_phrases, memo), do_to_all(input_phrases, len))
+        self.assertEqual(calls, ['a', 'bb', 'ccc', ['x', 'y'], ['x', 'y']])
+        self.assertEqual((memo.hits, memo.misses, memo.uncached), (3, 3, 2))
+        self.assertEqual(str(memo), "Memoize(hits=3, misses=3, uncached=2)")
+
+        # LRU: 'a' was used most recently, so 'bb' goes first
+        small: Memoize[str, int] = Memoize(slow_len, maxsize=2)
+        do_to_all(['a', 'bb', 'a', 'ccc', 'a', 'bb'], small)
+        self.assertEqual((small.hits, small.misses, len(small)), (2, 4, 2))
+
+        # maxsize=0 remembers nothing
+        none: Memoize[str, int] = Memoize(len, maxsize=0)
+        do_to_all(['a', 'a'], none)
+        self.assertEqual((none.hits, none.misses, len(none)), (0, 2, 0))
+
+        # equal, but of different types
+        typed: Memoize[Any, str] = Memoize(repr)
+        self.assertEqual(do_to_all([1, True, 1.0, 1], typed), ['1', 'True', '1.0', '1'])
+        self.assertEqual((typed.hits, typed.misses), (1, 3))
+
+    def test_batch_protocol(self) -> None:
+        """Tests batch entry points and do_to_all dispatch"""
+
+        input_phrases = ('', 'a', 'bb', 'ccc')
+
+        for f in (Excite(2), make_excitement(2)):
+            batch: Callable[[Iterable[str]], list[str]] | None = batch_of(f)
+            assert batch is not None
+            self.assertEqual(batch(input_phrases), list(map(f, input_phrases)))
+            self.assertEqual(batch(iter(input_phrases)), ['!!', 'a!!', 'bb!!', 'ccc!!'])
+
+        self.assertFalse(hasattr(Excite(2), '__dict__'))
+
+        class Counted:
+            """Callable that records how it was called"""
+
+            def __init__(self) -> None:
+                self.calls: list[str] = []
+
+            def __call__(self, phrase: str) -> int:
+                self.calls.append('one')
+                return len(phrase)
+
+            @batch_entry
+            def batch(self, phrases: Iterable[str]) -> list[int]:
+                """Records a batch call"""
+
+                self.calls.append('batch')
+                return [len(p) for p in phrases]
+
+        counted = Counted()
+        self.assertEqual(do_to_all(input_phrases, counted), [0, 1, 2, 3])
+        self.assertEqual(counted.calls, ['batch'])
+
+        # only marked batch entry points are used
+        class Sized32:  # pylint: disable=too-few-public-methods
+            """Callable with an unrelated batch attribute"""
+
+            batch: int = 32
+
+            def __call__(self, phrase: str) -> int:
+                return len(phrase)
+
+        self.assertIsNone(batch_of(Sized32()))
+        self.assertEqual(do_to_all(input_phrases, Sized32()), [0, 1, 2, 3])
+
+        mock: Mock = Mock(return_value=1)
+        self.assertIsNone(batch_of(mock))
+        self.assertEqual(do_to_all(input_phrases, mock), [1, 1, 1, 1])
+        self.assertEqual(mock.call_count, 4)
+
+    def test_lazy_do_to_all(self) -> None:
+        """Tests lazy_do_to_all"""
+
+        input_phrases = ('', 'a', 'bb', 'ccc')
+
+        self.assertEqual(list(lazy_do_to_all([], len)), [])
+        self.assertEqual(
+            list(lazy_do_to_all(input_phrases, len)),
+            do_to_all(input_phrases, len)
+        )
+
+        self.assertEqual(
+            list(lazy_do_to_all(iter(input_phrases), str.upper, chunk_size=3)),
+            [['', 'A', 'BB'], ['CCC']]
+        )
+
+        with self.assertRaises(ValueError):
+            next(lazy_do_to_all(input_phrases, len, chunk_size=0))
+
+        # nothing is done until asked for, and only as much as asked
+        seen: list[int] = []
+        def track(n: int) -> int:
+            seen.append(n)
+            return n * 2
+
+        results: Iterator[int] = lazy_do_to_all(count(), track)
+        self.assertEqual(seen, [])
+        self.assertEqual(list(islice(results, 3)), [0, 2, 4])
+        self.assertEqual(seen, [0, 1, 2])
+
+    def test_backends(self) -> None:
+        """Tests do_to_all/keep_if on execution backends"""
+
+        with self.assertRaises(ValueError):
+            Backend(chunksize=0)
+
+        input_phrases = [f"{i % 7}" * (i % 4) for i in range(50)]
+        is_pos: Callable[[float], bool] = lambda n: n > 0
+        nums = [(-1) ** i * i for i in range(50)]
+
+        for backend in (Backend(), ThreadBackend(chunksize=3), ProcessBackend(2, chunksize=8)):
+            with backend, self.subTest(backend=str(backend)):
+                self.assertEqual(
+                    do_to_all(input_phrases, len, backend), do_to_all(input_phrases, len)
+                )
+                self.assertEqual(
+                    do_to_all(iter(input_phrases), Excite(1), backend),
+                    do_to_all(input_phrases, Excite(1))
+                )
+                self.assertEqual(
+                    do_to_all(input_phrases, make_excitement(3), backend),
+                    do_to_all(input_phrases, make_excitement(3))
+                )
+                self.assertEqual(keep_if(nums, is_pos, backend), keep_if(nums, is_pos))
+
+                # worker exceptions arrive unchanged
+                with self.assertRaisesRegex(ZeroDivisionError, "division by zero"):
+                    do_to_all([1, 0, 2], lambda n: 1 / n, backend)
+
+        self.assertIsInstance(_portable(make_excitement(2)), _PortableFunction)
+        self.assertIs(_portable(len), len)
+        self.assertEqual(pickle.loads(pickle.dumps(_portable(make_excitement(2))))("a"), "a!!")
+
+        # keyword-only defaults and names survive the trip
+        def shout(s: str, *, mark: str = "!") -> str:
+            return s + mark
+
+        sent: _PortableFunction = pickle.loads(pickle.dumps(_portable(shout)))
+        self.assertEqual(sent("a"), "a!")
+        self.assertEqual(sent("a", mark="?"), "a?")
+        self.assertEqual(sent.__qualname__, shout.__qualname__)
+
+        # recursive inner functions refer to themselves via their closure
+        def fact(n: int) -> int:
+            return 1 if n <= 1 else n * fact(n - 1)
+
+        self.assertEqual(pickle.loads(pickle.dumps(_portable(fact)))(5), 120)
+
+        # the pool is reused until the backend is closed
+        threads: ThreadBackend = ThreadBackend(chunksize=2)
+        with threads:
+            do_to_all(nums, abs, threads)
+            pool: Executor | None = threads._pool  # pylint: disable=protected-access
+            do_to_all(nums, abs, threads)
+            self.assertIs(threads._pool, pool)  # pylint: disable=protected-access
+        self.assertIsNone(threads._pool)  # pylint: disable=protected-access
+        with ProcessBackend(2) as processes:
+            self.assertEqual(do_to_all([3, 5], fact, processes), [6, 120])
+
     ###
 
     def test_keep_positive(self) -> None:
@@ -487,12 +2875,113 @@ class TestPattern(unittest.TestCase):
         self.assertEqual(keep_positive([]), [])
         self.assertEqual(keep_positive([0, -1, 2, -3, -4, 5]), [2, 5])
 
+    def test_keep_if_mask(self) -> None:
+        """Tests keep_if/keep_positive on arrays"""
+
+        n_list1 = (0, -1, 2, -3, -4, 5)
+        arr: np.ndarray = np.array(n_list1)
+
+        self.assertEqual(keep_positive(arr).tolist(), keep_positive(list(n_list1)))
+        self.assertIsInstance(keep_positive(arr), np.ndarray)
+        self.assertEqual(keep_positive(np.array([], dtype=int)).tolist(), [])
+
+        calls: list[Any] = []
+        def is_pos(n: Any) -> Any:
+            calls.append(n)
+            return n > 0
+
+        # not registered: one call per item, even if it would vectorize
+        self.assertEqual(keep_if(arr, is_pos).tolist(), [2, 5])
+        self.assertEqual(len(calls), len(arr))
+
+        # registered: a single call with the whole array
+        calls.clear()
+        register_mask(is_pos)
+        try:
+            self.assertEqual(keep_if(arr, is_pos).tolist(), [2, 5])
+            self.assertEqual(len(calls), 1)
+        finally:
+            MASK_PREDICATES.discard(is_pos)
+
+        # the same answers as for lists, whatever p does on an array
+        words: list[str] = ['aba', 'ab', 'aa']
+        is_same: Callable[[str], bool] = lambda s: s == s[::-1]
+        self.assertEqual(keep_if(np.array(words), is_same).tolist(), keep_if(words, is_same))
+        nums: np.ndarray = np.array([[1.0, 5.0], [3.0, 0.0]])
+        above_mean: Callable[[Any], Any] = lambda x: x[0] > np.mean(x)
+        self.assertEqual(keep_if(nums, above_mean).tolist(), [[3.0, 0.0]])
+
+        # unhashable predicates just aren't registered
+        class Unhashable:  # pylint: disable=too-few-public-methods
+            """A callable object that can't go in a set"""
+            __hash__ = None  # type: ignore[assignment]
+
+            def __call__(self, n: Any) -> bool:
+                return n > 0
+
+        self.assertEqual(keep_if(arr, Unhashable()).tolist(), [2, 5])
+
+        # one call per item
+        is_palindromic: Callable[[Any], bool] = lambda x: str(x) == str(x)[::-1]
+        self.assertEqual(
+            keep_if(np.array([0, -1, 2, 100, 101]), is_palindromic).tolist(),
+            [0, 2, 101]
+        )
+        self.assertEqual(keep_if(np.array(['', 'a']), lambda s: len(s) > 0).tolist(), ['a'])
+        self.assertEqual(
+            keep_if(arr, lambda n: int(n) > 0, ThreadBackend(chunksize=2)).tolist(),
+            [2, 5]
+        )
+
+        # rows of a 2-D array are the items
+        rows: np.ndarray = np.array([[1, 2], [-1, 5], [3, 3]])
+        self.assertEqual(keep_if(rows, lambda r: r[..., 0] > 0).tolist(), [[1, 2], [3, 3]])
+
     def test_keep_palindromic(self) -> None:
         """Tests keep_palindromic"""
 
         self.assertEqual(keep_palindromic([]), [])
         self.assertEqual(keep_palindromic([0, -1, 2, 100, 101]), [0, 2, 101])
 
+    def test_palindromes(self) -> None:
+        """Tests the palindrome helpers against strings"""
+
+        is_palindromic: Callable[[int], bool] = lambda x: str(x) == str(x)[::-1]
+
+        nums: np.ndarray = np.arange(-120, 25_000)
+        self.assertEqual(
+            nums[is_palindromic_array(nums)].tolist(),
+            keep_if(nums.tolist(), is_palindromic)
+        )
+
+        # the biggest int64s reverse past the limit
+        big: np.ndarray = np.array(
+            [2**63 - 1, 9_000_000_000_000_000_009, 1_999_999_999_999_999_999]
+        )
+        self.assertEqual(is_palindromic_array(big).tolist(), [is_palindromic(int(n)) for n in big])
+
+        for start, stop in ((0, 0), (5, 3), (-50, 10), (0, 1), (7, 1234), (99, 102),
+                            (1000, 1001), (123, 98_765), (-5, 1)):
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual(
+                    list(palindromes_between(start, stop)),
+                    keep_if(range(start, stop), is_palindromic)
+                )
+
+        self.assertEqual(
+            keep_palindromic(range(-3, 50_000)),
+            keep_palindromic(list(range(-3, 50_000)))
+        )
+        self.assertEqual(
+            keep_palindromic(np.array([0, -1, 2, 100, 101])).tolist(),
+            [0, 2, 101]
+        )
+        self.assertEqual(keep_palindromic(range(0, 30, 3)), [0, 3, 6, 9])
+
+        # non-integer arrays are checked as strings, like lists
+        floats: np.ndarray = np.array([1.0, 1.1, 22.0, 12.21, -3.5])
+        self.assertEqual(keep_palindromic(floats).tolist(), [1.1, 12.21])
+
     def test_keep_if(self) -> None:
         """Tests keep_if"""
 
@@ -554,6 +3043,42 @@ class TestPattern(unittest.TestCase):
         self.assertEqual(my_len([]), 0)
         self.assertEqual(my_len([1, 2, 3, 4, 5, -6]), 6)
 
+    def test_my_sum_strategies(self) -> None:
+        """Tests my_sum strategies and fast paths"""
+
+        with self.assertRaises(ValueError):
+            my_sum([1], "nope")
+
+        ints = [1, 2, 3, 4, 5, -6]
+        for strategy in SUM_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                self.assertEqual(my_sum([], strategy), 0)
+                self.assertEqual(my_sum(ints, strategy), 9)
+                self.assertEqual(my_sum(iter(ints), strategy), 9)
+
+        # 0.1 ten thousand times: naive drifts, the others don't (as much)
+        tenths = [0.1] * 10_000
+        exact: float = math.fsum(tenths)
+        self.assertNotEqual(my_sum(tenths), exact)
+        self.assertEqual(my_sum(tenths, "kahan"), exact)
+        self.assertAlmostEqual(my_sum(tenths, "pairwise"), exact, places=10)
+
+        # cancellation only the compensated/exact ones survive
+        self.assertEqual(my_sum([1e100, 1.0, -1e100], "kahan"), 1.0)
+        self.assertEqual(my_sum([1e100, 1.0, -1e100], "exact"), 1.0)
+
+        # arrays and typed buffers go to numpy
+        self.assertEqual(my_sum(np.array(ints)), 9)
+        self.assertEqual(my_sum(array.array('d', tenths)), my_sum(np.array(tenths)))
+        self.assertEqual(my_sum(memoryview(array.array('i', ints))), 9)
+
+    def test_my_len_fast(self) -> None:
+        """Tests my_len on sized and unsized inputs"""
+
+        self.assertEqual(my_len(range(10**12)), 10**12)
+        self.assertEqual(my_len(iter([1, 2, 3])), 3)
+        self.assertEqual(my_len(x for x in 'abc'), 3)
+
     def test_any_dftba(self) -> None:
         """Tests any_dftba"""
 
@@ -562,6 +3087,42 @@ class TestPattern(unittest.TestCase):
         self.assertEqual(any_dftba(['DFTBA']), True)
         self.assertEqual(any_dftba(['nope', 'DFtbA', 'NO']), True)
 
+    def test_term_matcher(self) -> None:
+        """Tests TermMatcher queries"""
+
+        with self.assertRaises(ValueError):
+            TermMatcher([])
+
+        matcher: TermMatcher = TermMatcher(['DFTBA', 'nope', 'Straße', 'nope'])
+        phrases = ['', 'a', 'NOPE', 'dftba', 'strasse', 'Nope', 'bb']
+
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.match('DFtbA'), 'dftba')
+        self.assertIsNone(matcher.match('dftba!'))
+
+        self.assertTrue(matcher.any(phrases))
+        self.assertFalse(matcher.any(['', 'a', 'bb']))
+        self.assertFalse(matcher.any([]))
+
+        self.assertFalse(matcher.all(phrases))
+        self.assertTrue(matcher.all(['NoPe', 'STRASSE']))
+        self.assertTrue(matcher.all([]))
+
+        self.assertEqual(matcher.which(phrases), {'nope', 'dftba', 'strasse'})
+        self.assertEqual(matcher.which(['a']), set())
+        self.assertEqual(matcher.count(phrases), {'nope': 2, 'dftba': 1, 'strasse': 1})
+
+        # early stopping on endless streams
+        self.assertTrue(matcher.any(chain(['a', 'NOPE'], repeat('a'))))
+        self.assertFalse(matcher.all(chain(['nope', 'a'], repeat('nope'))))
+        self.assertEqual(
+            matcher.which(chain(['dftba', 'strasse', 'nope'], repeat('a'))),
+            {'nope', 'dftba', 'strasse'}
+        )
+
+        for p in (['DFTBA'], ['nope', 'DFtbA', 'NO'], ['', 'a', 'bb', 'ccc']):
+            self.assertEqual(any_dftba(p), any(x.lower() == "dftba" for x in p))
+
     #
 
     def test_combine(self) -> None:
@@ -677,5 +3238,301 @@ class TestPattern(unittest.TestCase):
             # True
         )
 
+    def test_scan(self) -> None:
+        """Tests scan, including resuming"""
+
+        add_int: Callable[[int, int], int] = lambda acc_old, val_new: acc_old + val_new
+        nums = [1, 2, 3, 4, 5, -6, 7, 8, 9, 10]
+        expected: list[int] = list(accumulate(nums, add_int, initial=0))
+
+        self.assertEqual(list(scan([], add_int, 0)), [0])
+        self.assertEqual(list(scan(nums, add_int, 0)), expected)
+        self.assertEqual(list(scan(nums, add_int, 0))[-1], combine(nums, add_int, 0))
+
+        with self.assertRaises(ValueError):
+            next(scan(nums, add_int, 0, every=0))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cp: str = os.path.join(tmp, "scan.ckpt")
+
+            # "crash" after 7 results (checkpointed after items 3 and 6)
+            before: list[int] = []
+            for acc in scan(iter(nums), add_int, 0, checkpoint=cp, every=3):
+                before.append(acc)
+                if len(before) == 7:
+                    break
+
+            self.assertTrue(os.path.exists(cp))
+
+            after: list[int] = list(scan(iter(nums), add_int, 0, checkpoint=cp, every=3))
+            self.assertEqual(before[:6] + after, expected)
+            self.assertFalse(os.path.exists(cp))
+
+            # nothing left over, so the next run starts fresh
+            self.assertEqual(list(scan(nums, add_int, 0, checkpoint=cp, every=3)), expected)
+
+    def test_incremental_combine(self) -> None:
+        """Tests RunningCombine/SegmentCombine against combine"""
+
+        add_int: Callable[[int, int], int] = lambda acc_old, val_new: acc_old + val_new
+        sub_int: Callable[[int, int], int] = lambda acc_old, val_new: acc_old - val_new
+
+        with self.assertRaises(ValueError):
+            RunningCombine(add_int, 0).remove(1)
+
+        with self.assertRaises(ValueError):
+            RunningCombine(add_int, 0, sub_int).remove(1)
+
+        rng = np.random.default_rng(2100)
+        running: RunningCombine[int, int] = RunningCombine(add_int, 5, sub_int)
+        joined: SegmentCombine[str] = SegmentCombine(Monoid(str.__add__, ""), "<")
+        biggest: SegmentCombine[int] = SegmentCombine(Monoid(max, -10**9), -10**9)
+
+        nums: list[int] = []
+        phrases: dict[int, str] = {}
+        handles: dict[int, int] = {}
+
+        for step in range(300):
+            if nums and rng.random() < 0.4:
+                at: int = int(rng.integers(len(nums)))
+                n: int = nums.pop(at)
+                running.remove(n)
+
+                handle: int = list(phrases)[at]
+                del phrases[handle]
+                joined.remove(handle)
+                biggest.remove(handles.pop(handle))
+            else:
+                n = int(rng.integers(-50, 50))
+                nums.append(n)
+                running.add(n)
+
+                handle = joined.add(chr(ord('a') + step % 26))
+                phrases[handle] = chr(ord('a') + step % 26)
+                handles[handle] = biggest.add(n)
+
+            self.assertEqual(running.result, combine(nums, add_int, 5))
+            self.assertEqual(joined.result, combine(phrases.values(), str.__add__, "<"))
+            self.assertEqual(biggest.result, combine(nums, max, -10**9))
+            self.assertEqual(len(running), len(nums))
+            self.assertEqual(len(joined), len(nums))
+
+        with self.assertRaises(ValueError):
+            joined.remove(10**6)
+
+        first: int = next(iter(phrases))
+        joined.remove(first)
+        with self.assertRaises(ValueError):
+            joined.remove(first)
+
+    def test_segment_combine_compacts(self) -> None:
+        """Tests SegmentCombine reclaims removed items' leaves"""
+
+        window: SegmentCombine[str] = SegmentCombine(Monoid(str.__add__, ""), "")
+        live: dict[int, str] = {}
+        for step in range(1000):
+            live[window.add(str(step % 10))] = str(step % 10)
+            if len(live) > 3:
+                window.remove(next(iter(live)))
+                del live[next(iter(live))]
+
+        self.assertEqual(window.result, "".join(live.values()))
+        self.assertLessEqual(window._capacity, 8)  # pylint: disable=protected-access
+        for handle in list(live):
+            window.remove(handle)
+        self.assertEqual((window.result, len(window)), ("", 0))
+
+    def test_combine_early(self) -> None:
+        """Tests combine stopping early"""
+
+        or_dftba: Callable[[bool, str], bool] = \
+            lambda acc_old, val_new: acc_old or (val_new.lower() == "dftba")
+
+        # infinite streams only finish if we stop early
+        self.assertTrue(any_dftba(chain(['nope', 'DFtbA'], repeat('NO'))))
+        self.assertTrue(combine(repeat('NO'), or_dftba, True, absorbing=True))
+
+        phrases = iter(['', 'dftba', 'a', 'bb'])
+        self.assertTrue(combine(phrases, or_dftba, False, absorbing=True))
+        self.assertEqual(list(phrases), ['a', 'bb'])
+
+        self.assertFalse(combine(['', 'a', 'bb'], or_dftba, False, absorbing=True))
+
+        # stop signal: sum until the total passes 10
+        capped: Callable[[int, int], int | Stop[int]] = \
+            lambda acc_old, val_new: Stop(acc_old) if acc_old > 10 else acc_old + val_new
+        self.assertEqual(combine(count(1), capped, 0), 15)
+        self.assertEqual(combine([1, 2], capped, 0), 3)
+        self.assertEqual(str(Stop(3)), "Stop(3)")
+
+    def test_combine_monoid(self) -> None:
+        """Tests combine with Monoids on backends"""
+
+        add_int: Monoid[int] = Monoid(lambda acc_old, val_new: acc_old + val_new, 0)
+        add_str: Monoid[str] = Monoid(str.__add__, "")
+        add_1: Callable[[int, int], int] = lambda acc_old, _: acc_old + 1
+
+        nums = list(range(-500, 1234))
+        phrases = [chr(ord('a') + i % 26) * (i % 3) for i in range(300)]
+
+        backends: tuple[Backend, ...] = (
+            Backend(chunksize=7), ThreadBackend(chunksize=10), ProcessBackend(2, chunksize=50)
+        )
+        for backend in backends:
+            with backend, self.subTest(backend=str(backend)):
+                self.assertEqual(combine([], add_int, 5, backend), 5)
+                self.assertEqual(combine(nums, add_int, 5, backend), reduce(add_int, nums, 5))
+                self.assertEqual(
+                    combine(phrases, add_str, "<", backend), reduce(add_str, phrases, "<")
+                )
+
+                # not declared associative: still serial (and still right)
+                self.assertEqual(combine(nums, add_1, 0, backend), reduce(add_1, nums, 0))
+
+        self.assertEqual(combine(nums, add_int, 0), sum(nums))
+        self.assertEqual(str(add_str), "Monoid('')")
+
+    #
+
+    def test_async(self) -> None:
+        """Tests async_do_to_all/async_keep_if"""
+
+        in_flight: list[int] = [0, 0]  # [now, most]
+
+        async def slow_len(phrase: str) -> int:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            # later items finish first
+            await asyncio.sleep(0.001 * (10 - len(phrase)))
+            in_flight[0] -= 1
+            return len(phrase)
+
+        async def is_even(n: int) -> bool:
+            await asyncio.sleep(0)
+            return n % 2 == 0
+
+        async def fails(n: int) -> int:
+            await asyncio.sleep(0)
+            return 1 // n
+
+        pulled: list[int] = []
+        ended: list[str] = []
+
+        async def source() -> AsyncGenerator[str, None]:
+            try:
+                for i in range(8):
+                    pulled.append(i)
+                    yield 'x' * i
+            finally:
+                ended.append('source')
+
+        async def tracked(phrase: str) -> int:
+            try:
+                await asyncio.sleep(len(phrase))
+                return len(phrase)
+            finally:
+                ended.append(phrase)
+
+        async def run() -> None:
+            phrases = ['x' * i for i in range(8)]
+
+            self.assertEqual(
+                [n async for n in async_do_to_all(phrases, slow_len, limit=3)],
+                do_to_all(phrases, len)
+            )
+            self.assertEqual(in_flight[1], 3)
+
+            unordered: list[int] = [
+                n async for n in async_do_to_all(phrases, slow_len, ordered=False)
+            ]
+            self.assertEqual(sorted(unordered), do_to_all(phrases, len))
+            self.assertNotEqual(unordered, do_to_all(phrases, len))
+
+            # backpressure: only limit items are read ahead
+            results = async_do_to_all(source(), slow_len, limit=2)
+            self.assertEqual(await anext(results), 0)
+            self.assertEqual(len(pulled), 2)
+            await results.aclose()
+
+            # closing early cancels (and waits for) the work
+            # in flight, and closes the source
+            ended.clear()
+            tracked_results = async_do_to_all(source(), tracked, limit=2)
+            self.assertEqual(await anext(tracked_results), 0)
+            await tracked_results.aclose()
+            self.assertEqual(ended, ['', 'x', 'source'])
+
+            self.assertEqual(
+                [n async for n in async_keep_if(range(10), is_even, limit=4)],
+                keep_if(range(10), lambda n: n % 2 == 0)
+            )
+            self.assertEqual(
+                sorted([n async for n in async_keep_if(range(10), is_even, ordered=False)]),
+                [0, 2, 4, 6, 8]
+            )
+
+            with self.assertRaises(ZeroDivisionError):
+                _ = [n async for n in async_do_to_all([1, 0, 2], fails)]
+
+            with self.assertRaises(ValueError):
+                _ = [n async for n in async_do_to_all([1], fails, limit=0)]
+
+        asyncio.run(run())
+
+    def test_pipeline(self) -> None:
+        """Tests Pipeline against the separate stages"""
+
+        is_pos: Callable[[int], bool] = lambda n: n > 0
+        add_int: Callable[[int, int], int] = lambda acc_old, val_new: acc_old + val_new
+        square: Callable[[int], int] = lambda n: n * n
+        nums = [(-1) ** i * (i % 17) for i in range(500)]
+
+        expected_list: list[int] = keep_if(do_to_all(nums, square), is_pos)
+        expected: int = combine(keep_if(do_to_all(nums, square), is_pos), add_int, 3)
+
+        # streaming: nothing is read until asked for
+        source = iter(nums)
+        pipe: Pipeline[int] = Pipeline(source).map(square).filter(is_pos)
+        self.assertEqual(next(iter(pipe)), 1)
+        self.assertEqual(len(list(source)), 498)
+
+        self.assertEqual(Pipeline(nums).map(square).filter(is_pos).collect(), expected_list)
+        self.assertEqual(Pipeline(nums).map(square).filter(is_pos).reduce(add_int, 3), expected)
+        self.assertEqual(
+            [
+                out for chunk in Pipeline(nums).map(square).filter(is_pos).stream(10)
+                for out in chunk
+            ],
+            expected_list
+        )
+        self.assertTrue(Pipeline(count()).map(str).reduce(lambda acc, s: acc or s == "42", False,
+                                                          absorbing=True))
+
+        for backend in (ThreadBackend(chunksize=30), ProcessBackend(2, chunksize=64)):
+            with backend, self.subTest(backend=str(backend)):
+                self.assertEqual(
+                    Pipeline(nums, backend).map(square).filter(is_pos).collect(),
+                    expected_list
+                )
+                self.assertEqual(
+                    Pipeline(nums, backend).map(square).filter(is_pos).reduce(add_int, 3),
+                    expected
+                )
+
+                profiled: Pipeline[int] = Pipeline(nums, backend, profile=True)
+                self.assertEqual(
+                    profiled.map(square).filter(is_pos).reduce(Monoid(add_int, 0), 3),
+                    expected
+                )
+                self.assertEqual(
+                    sorted(profiled.timings),
+                    ["0:map:<lambda>", "1:filter:<lambda>", "reduce"]
+                )
+
+        profiled = Pipeline(nums, profile=True).map(square).filter(is_pos)
+        self.assertEqual(profiled.reduce(add_int, 3), expected)
+        self.assertTrue(all(t >= 0 for t in profiled.timings.values()))
+        self.assertEqual(len(profiled.timings), 3)
+
 if __name__ == "__main__":
     unittest.main()
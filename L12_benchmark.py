@@ -0,0 +1,106 @@
+"""
+How fast are our (design) patterns?
+"""
+
+from typing import Callable
+from functools import partial
+
+import math
+import timeit
+
+import numpy as np
+
+from L12_accumulator_final import COLUMN_VERSIONS, SUM_STRATEGIES, my_sum
+
+###############
+# Constants
+###############
+
+SIZES: list[int] = [10, 100, 1_000, 10_000, 100_000]
+REPEATS: int = 5
+SUM_SIZE: int = 1_000_000
+
+###############
+
+def best_time(f: Callable[[], object], repeats: int = REPEATS) -> float:
+    """
+    Times a function call
+
+    Parameters
+    ==========
+    f: Callable[[], object]
+        what to time
+
+    repeats: int
+        how many times to try
+
+    Returns
+    =======
+    float
+        fastest time, in seconds
+    """
+
+    return min(timeit.repeat(f, number=1, repeat=repeats))
+
+def bench_strings() -> None:
+    """
+    Compares the list versions of the
+    string functions with the column
+    versions, and reports where the
+    columns start winning
+    """
+
+    print(f"{'function':>14} {'n':>8} {'list (s)':>10} {'column (s)':>11}")
+
+    for list_f, column_f in COLUMN_VERSIONS:
+        crossover: int | None = None
+
+        for n in SIZES:
+            phrases: list[str] = [f"phrase {i}" for i in range(n)]
+            column: np.ndarray = np.array(phrases)
+
+            # partial binds this iteration's values
+            list_s: float = best_time(partial(list_f, phrases))
+            column_s: float = best_time(partial(column_f, column))
+
+            print(f"{list_f.__name__:>14} {n:>8} {list_s:>10.6f} {column_s:>11.6f}")
+
+            if crossover is None and column_s < list_s:
+                crossover = n
+
+        print(f"  -> column wins from n={crossover}\n" if crossover
+              else "  -> column never wins here\n")
+
+def bench_sums() -> None:
+    """
+    Compares the my_sum strategies for
+    speed (on a list, and on an array
+    for numpy) and accuracy (error vs.
+    the correctly-rounded math.fsum)
+    """
+
+    rng = np.random.default_rng(2100)
+
+    # wildly different magnitudes, so rounding error shows
+    values: np.ndarray = rng.normal(size=SUM_SIZE) * 10.0 ** rng.integers(-8, 8, size=SUM_SIZE)
+    as_list: list[float] = values.tolist()
+    exact: float = math.fsum(as_list)
+
+    print(f"{'strategy':>10} {'list (s)':>10} {'array (s)':>10} {'abs error':>12}")
+
+    for strategy in SUM_STRATEGIES:
+        list_s: float = best_time(partial(my_sum, as_list, strategy), repeats=3)
+        array_s: float = best_time(partial(my_sum, values, strategy), repeats=3) \
+            if strategy == "numpy" else float('nan')
+        error: float = abs(my_sum(as_list, strategy) - exact)
+
+        print(f"{strategy:>10} {list_s:>10.4f} {array_s:>10.4f} {error:>12.3e}")
+
+def main() -> None:
+    """Runs all the benchmarks"""
+
+    bench_strings()
+    bench_sums()
+
+if __name__ == "__main__":
+    main()
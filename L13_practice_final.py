@@ -2,11 +2,23 @@
 Some practice related to data & functions
 """
 
-from typing import Callable, TypeVar
+# lecture code and its tests live together in one file
+# pylint: disable=too-many-lines
 
+from typing import Any, Callable, Generic, Hashable, Iterable, Iterator, Sequence, TypeVar, overload
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import heapq
+import math
+import os
+import tempfile
+import time
 import unittest
+import warnings
 
 import numpy as np
+import pandas as pd
 
 ##################################################
 # 1. Normalizing data
@@ -30,39 +42,325 @@ import numpy as np
 # ideally using our great new Python
 # superpowers :)
 
-def normalize(vals: list[float]) -> list[float]:
+# arrays are scanned this many elements at a time, so
+# min and max are both found while a block is in cache
+MINMAX_BLOCK: int = 1 << 16
+
+def _min_max(arr: np.ndarray) -> tuple[float, float]:
+    """
+    Finds the min and max of an array
+    in a single pass over memory,
+    skipping NaNs
+
+    Parameters
+    ==========
+    arr: np.ndarray
+        non-empty values to scan
+
+    Returns
+    =======
+    tuple[float, float]
+        (min, max), as Python numbers (so
+        e.g. int8 bounds can't overflow
+        later); NaN if every value is NaN
+    """
+
+    flat: np.ndarray = arr.reshape(-1)
+    x_min = x_max = flat[0]
+
+    # fmin/fmax ignore NaN (unless both sides are), so a
+    # NaN can't hide the rest of its block
+    for start in range(0, len(flat), MINMAX_BLOCK):
+        block: np.ndarray = flat[start:start + MINMAX_BLOCK]
+        x_min = np.fmin(x_min, np.fmin.reduce(block))
+        x_max = np.fmax(x_max, np.fmax.reduce(block))
+
+    return x_min.item(), x_max.item()
+
+def _normalize_array(arr: np.ndarray, x_min: float, x_max: float,
+                     out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Applies (x_i - x_min) / (x_max - x_min)
+    to a whole array, without temporaries
+
+    Parameters
+    ==========
+    arr: np.ndarray
+        values to normalize
+
+    x_min: float
+        smallest value
+
+    x_max: float
+        largest value
+
+    out: np.ndarray | None
+        where to write (may be arr itself);
+        allocated if not supplied
+
+    Returns
+    =======
+    np.ndarray
+        normalized values (out, if supplied)
+    """
+
+    if out is None:
+        dtype = arr.dtype if arr.dtype in (np.float32, np.float64) else np.float64
+        out = np.empty(arr.shape, dtype=dtype)
+
+    # bounds and subtraction in the output dtype, so narrow
+    # ints (e.g., int8) can't overflow and bools work
+    lo = out.dtype.type(x_min)
+    span = out.dtype.type(x_max) - lo
+
+    np.subtract(arr, lo, out=out, dtype=out.dtype)
+    np.divide(out, span, out=out)
+
+    return out
+
+@overload
+def normalize(vals: list[float]) -> list[float]: ...
+
+@overload
+def normalize(vals: np.ndarray, out: np.ndarray | None = None) -> np.ndarray: ...
+
+def normalize(vals: list[float] | np.ndarray,
+              out: np.ndarray | None = None) -> list[float] | np.ndarray:
     """
     Normalizes the supplied data
     points into [0, 1]
 
     Parameters
     ==========
-    vals: list[float]
-        numbers to normalize
+    vals: list[float] | np.ndarray
+        numbers to normalize (arrays are
+        normalized without Python loops)
+
+    out: np.ndarray | None
+        array to write into, only for
+        array inputs; pass vals itself to
+        normalize in place
 
     Returns
     =======
-    list[float]
-        normalized values
+    list[float] | np.ndarray
+        normalized values (same kind
+        as the input)
 
     Raises
     ======
     ValueError
-        fewer than two distinct
-        values are supplied
+        fewer than two distinct (non-NaN)
+        values are supplied; NaNs are
+        skipped and stay NaN
     """
 
-    if len(set(vals)) < 2:
+    if isinstance(vals, np.ndarray):
+        # two distinct values <=> min differs from max,
+        # so no need to hash anything
+        if vals.size == 0:
+            raise ValueError
+
+        arr_min, arr_max = _min_max(vals)
+        if not arr_min < arr_max:
+            raise ValueError
+
+        return _normalize_array(vals, arr_min, arr_max, out)
+
+    # NaNs stay NaN, as for arrays
+    present: list[float] = [x for x in vals if not math.isnan(x)]
+    if len(set(present)) < 2:
         raise ValueError
 
-    x_max: float = max(vals)
-    x_min: float = min(vals)
+    x_max: float = max(present)
+    x_min: float = min(present)
 
     nf: Callable[[float], float] = lambda x_i: (x_i - x_min) / (x_max - x_min)
 
     return [nf(x) for x in vals]
 
 
+class MinMaxScaler:
+    """
+    Incremental version of normalize:
+    learns the min/max one chunk at a
+    time, then normalizes chunks with them
+    """
+
+    def __init__(self) -> None:
+        """Initializes an unfitted MinMaxScaler"""
+
+        self._min: float | None = None
+        self._max: float | None = None
+
+    def partial_fit(self, chunk: list[float] | np.ndarray | pd.Series) -> None:
+        """
+        Updates the running min/max
+
+        Parameters
+        ==========
+        chunk: list[float] | np.ndarray | pd.Series
+            next values (arrays may be memory-
+            mapped; Series may be columns of
+            CSV chunks)
+        """
+
+        if isinstance(chunk, list):
+            present: list[float] = [x for x in chunk if not math.isnan(x)]
+            if not present:
+                return
+            c_min, c_max = min(present), max(present)
+        else:
+            arr: np.ndarray = np.asarray(chunk)
+            if arr.size == 0:
+                return
+            c_min, c_max = _min_max(arr)
+            if math.isnan(c_min):
+                # all NaN
+                return
+
+        self._min = c_min if self._min is None else min(self._min, c_min)
+        self._max = c_max if self._max is None else max(self._max, c_max)
+
+    @overload
+    def transform(self, chunk: list[float]) -> list[float]: ...
+
+    @overload
+    def transform(self, chunk: np.ndarray, out: np.ndarray | None = None) -> np.ndarray: ...
+
+    def transform(self, chunk: list[float] | np.ndarray,
+                  out: np.ndarray | None = None) -> list[float] | np.ndarray:
+        """
+        Normalizes a chunk using the
+        min/max seen so far
+
+        Parameters
+        ==========
+        chunk: list[float] | np.ndarray
+            values to normalize
+
+        out: np.ndarray | None
+            array to write into (see normalize)
+
+        Returns
+        =======
+        list[float] | np.ndarray
+            normalized values (same kind
+            as the input)
+
+        Raises
+        ======
+        ValueError
+            fewer than two distinct
+            values have been fit
+        """
+
+        if self._min is None or self._max is None or not self._min < self._max:
+            raise ValueError
+
+        x_min: float = self._min
+        x_max: float = self._max
+
+        if isinstance(chunk, list):
+            return [(x - x_min) / (x_max - x_min) for x in chunk]
+
+        return _normalize_array(np.asarray(chunk), x_min, x_max, out)
+
+    def fit_transform(self, chunk: list[float] | np.ndarray) -> list[float] | np.ndarray:
+        """
+        Fits a chunk, then transforms it
+        (earlier chunks are NOT revisited,
+        so only the final result of a
+        stream matches normalize)
+
+        Parameters
+        ==========
+        chunk: list[float] | np.ndarray
+            values to fit and normalize
+
+        Returns
+        =======
+        list[float] | np.ndarray
+            normalized values
+
+        Raises
+        ======
+        ValueError
+            fewer than two distinct
+            values have been fit
+        """
+
+        self.partial_fit(chunk)
+        return self.transform(chunk)
+
+
+@overload
+def normalize_columns(table: np.ndarray) -> tuple[np.ndarray, Sequence[Hashable]]: ...
+
+@overload
+def normalize_columns(table: pd.DataFrame) -> tuple[pd.DataFrame, Sequence[Hashable]]: ...
+
+def normalize_columns(table: np.ndarray | pd.DataFrame
+                      ) -> tuple[np.ndarray | pd.DataFrame, Sequence[Hashable]]:
+    """
+    Normalizes every column of a 2-D
+    table into [0, 1] at once, ignoring
+    NaNs when finding each min/max
+
+    Parameters
+    ==========
+    table: np.ndarray | pd.DataFrame
+        rows x columns of numbers
+
+    Returns
+    =======
+    tuple[np.ndarray | pd.DataFrame, Sequence[Hashable]]
+        normalized table (same kind as the
+        input; NaNs stay NaN), and the
+        columns (indexes, or DataFrame
+        labels) with fewer than two distinct
+        values - those come back all NaN
+        rather than failing the batch
+
+    Raises
+    ======
+    ValueError
+        table is not 2-D
+    """
+
+    arr: np.ndarray = table.to_numpy(dtype=np.float64) if isinstance(table, pd.DataFrame) \
+        else np.asarray(table)
+
+    if arr.ndim != 2:
+        raise ValueError("Must supply a 2-D table")
+
+    if arr.dtype not in (np.float32, np.float64):
+        arr = arr.astype(np.float64)
+
+    # all-NaN columns warn (and give NaN), which
+    # we report as degenerate anyway
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        col_min: np.ndarray = np.nanmin(arr, axis=0) if len(arr) else np.full(arr.shape[1], np.nan)
+        col_max: np.ndarray = np.nanmax(arr, axis=0) if len(arr) else np.full(arr.shape[1], np.nan)
+
+    # "not <" also catches NaN (empty/all-NaN) columns
+    degenerate: np.ndarray = ~(col_min < col_max)
+    span: np.ndarray = np.where(degenerate, np.nan, col_max - col_min)
+
+    result: np.ndarray = np.empty_like(arr)
+    np.subtract(arr, col_min, out=result)
+    np.divide(result, span, out=result)
+
+    if isinstance(table, pd.DataFrame):
+        return (
+            pd.DataFrame(result, index=table.index, columns=table.columns),
+            table.columns[degenerate].tolist()
+        )
+
+    return result, np.flatnonzero(degenerate).tolist()
+
+
 ##################################################
 # 2. Custom sorting
 ##################################################
@@ -87,8 +385,311 @@ def normalize(vals: list[float]) -> list[float]:
 #   of steps below
 
 T = TypeVar('T')
+F = TypeVar('F', bound=Callable[..., Any])
+
+# selecting k of n items is O(n) with argpartition,
+# but only pays off when k is small relative to n
+# (otherwise we'd sort most of the survivors anyway)
+PARTITION_MIN_N: int = 1024
+PARTITION_MAX_FRACTION: float = 0.25
+
+def _use_partition(n: int, k: int) -> bool:
+    """
+    Decides between a full sort and
+    a partial selection for top-k
+
+    Parameters
+    ==========
+    n: int
+        how many ratings
+
+    k: int
+        how many to select
+
+    Returns
+    =======
+    bool
+        True if partial selection
+        should be used
+    """
+
+    return n >= PARTITION_MIN_N and k <= n * PARTITION_MAX_FRACTION
+
+def _top_k_indexes(ratings: np.ndarray, k: int) -> np.ndarray:
+    """
+    Gets the indexes of the k highest
+    ratings, best first; ties go to the
+    later index (as if stably sorting
+    ascending and reading backwards)
+
+    Parameters
+    ==========
+    ratings: np.ndarray
+        1-D ratings to select from
+
+    k: int
+        how many indexes to return
+
+    Returns
+    =======
+    np.ndarray
+        k indexes into ratings
+    """
+
+    n: int = len(ratings)
+
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    numeric: bool = np.issubdtype(ratings.dtype, np.number) or ratings.dtype == np.bool_
+    if not (numeric and _use_partition(n, k)):
+        return np.argsort(ratings, kind='stable')[::-1][:k]
+
+    # the k-th largest rating splits winners from losers...
+    pivot = ratings[np.argpartition(ratings, n - k)[n - k]]
+    if ratings.dtype.kind in 'fc' and np.isnan(pivot):
+        # NaN pivot (NaN sorts last, so it's "largest")
+        return np.argsort(ratings, kind='stable')[::-1][:k]
+
+    # ...everything strictly above it survives (written as
+    # "not <=" so NaNs count as above, as they do in argsort)...
+    above: np.ndarray = np.flatnonzero(~(ratings <= pivot))
+
+    # ...and the latest ties at the pivot fill the rest
+    tied: np.ndarray = np.flatnonzero(ratings == pivot)
+    survivors: np.ndarray = np.concatenate((above, tied[len(tied) - (k - len(above)):]))
+
+    # finally, order just the k survivors (rating, then index)
+    order: np.ndarray = np.lexsort((survivors, ratings[survivors]))[::-1]
+    return survivors[order]
+
+# how many items each executor task rates
+RATE_CHUNKSIZE: int = 1024
+
+def _rate_chunk(eval_f: Callable[[T], float], chunk: Sequence[T] | np.ndarray) -> list[float]:
+    """
+    Rates a chunk of items (module-level,
+    so process pools can pickle it)
+
+    Parameters
+    ==========
+    eval_f: Callable[[T], float]
+        evaluation function
+
+    chunk: Sequence[T] | np.ndarray
+        items to rate
+
+    Returns
+    =======
+    list[float]
+        ratings, in order
+    """
+
+    return [eval_f(i) for i in chunk]
+
+def _rate_all(items: Sequence[T] | np.ndarray, eval_f: Callable[[T], float],
+              executor: Executor | None = None,
+              chunksize: int = RATE_CHUNKSIZE) -> list[float]:
+    """
+    Rates every item, optionally
+    spreading chunks over an executor
+
+    Parameters
+    ==========
+    items: Sequence[T] | np.ndarray
+        items to rate
+
+    eval_f: Callable[[T], float]
+        evaluation function (must be
+        picklable for process pools)
+
+    executor: Executor | None
+        where to run chunks; None means
+        serially, right here
+
+    chunksize: int
+        items per submitted task
+
+    Returns
+    =======
+    list[float]
+        ratings, in the order of items
+        (whatever order chunks finish in)
+
+    Raises
+    ======
+    ValueError
+        non-positive chunksize
+    """
+
+    if executor is None:
+        return _rate_chunk(eval_f, items)
+
+    if chunksize < 1:
+        raise ValueError("Must have positive chunksize")
+
+    futures = [
+        executor.submit(_rate_chunk, eval_f, items[start:start + chunksize])
+        for start in range(0, len(items), chunksize)
+    ]
+
+    return [r for fut in futures for r in fut.result()]
+
+def _abs_array(arr: np.ndarray) -> np.ndarray:
+    """
+    abs, for a whole array, without
+    np.abs's wraparound at the most
+    negative signed int
+
+    Parameters
+    ==========
+    arr: np.ndarray
+        items to rate
+
+    Returns
+    =======
+    np.ndarray
+        |item| per item (unsigned for
+        signed int inputs)
+    """
+
+    if arr.dtype.kind == 'i':
+        # e.g., np.abs gives -128 for int8 -128, whose
+        # bits are 128 when read as uint8
+        return np.abs(arr).view(np.dtype(f"u{arr.dtype.itemsize}"))
+
+    return np.abs(arr)
+
+# scalar eval functions that also have a whole-array
+# version (array of items -> array of ratings)
+BATCH_SCORERS: dict[Callable[..., Any], Callable[[np.ndarray], np.ndarray]] = {
+    abs: _abs_array,
+    float: lambda arr: arr.astype(np.float64),
+}
+
+def register_batch_scorer(eval_f: F,
+                          batch_f: Callable[[np.ndarray], np.ndarray] | None = None) -> F:
+    """
+    Declares that an eval function can
+    rate a whole array at once; usable
+    as a decorator when eval_f itself
+    already works on arrays
+
+    Parameters
+    ==========
+    eval_f: F
+        evaluation function, as passed to
+        top_k (if batch_f is None, it must
+        also map an array of items to an
+        array of ratings)
+
+    batch_f: Callable[[np.ndarray], np.ndarray] | None
+        array version of eval_f; None
+        means eval_f itself
+
+    Returns
+    =======
+    F
+        eval_f, unchanged
+    """
+
+    BATCH_SCORERS[eval_f] = eval_f if batch_f is None else batch_f
+
+    return eval_f
+
+def _batch_scorer(eval_f: Callable[..., Any]) -> Callable[[np.ndarray], np.ndarray] | None:
+    """
+    Finds the whole-array version of
+    an eval function, if registered
+
+    Parameters
+    ==========
+    eval_f: Callable[..., Any]
+        evaluation function
+
+    Returns
+    =======
+    Callable[[np.ndarray], np.ndarray] | None
+        array version, or None (also for
+        unhashable callables, which can't
+        have been registered)
+    """
+
+    if not isinstance(eval_f, Hashable):
+        return None
+
+    return BATCH_SCORERS.get(eval_f)
+
+def _top_k_pandas(items: pd.Series | pd.DataFrame,
+                  eval_f: Callable[[Any], float] | str | None, k: int) -> pd.Series | pd.DataFrame:
+    """
+    Columnar top-k for pandas inputs
+
+    Parameters
+    ==========
+    items: pd.Series | pd.DataFrame
+        rows to evaluate
+
+    eval_f: Callable[[Any], float] | str | None
+        Series: None rates by the values
+        themselves, a callable is applied
+        per value (or once, if it is in
+        BATCH_SCORERS); DataFrame: a
+        column name, else an expression
+        for DataFrame.eval
+
+    k: int
+        how many rows to return
+
+    Returns
+    =======
+    pd.Series | pd.DataFrame
+        top-k rows, ordered as top_k
+        orders a list
+
+    Raises
+    ======
+    ValueError
+        not one rating per row
+
+    TypeError
+        unsupported eval_f for the input
+    """
+
+    ratings: np.ndarray
+    if isinstance(items, pd.DataFrame):
+        if not isinstance(eval_f, str):
+            raise TypeError("Must rate a DataFrame by a column name or expression")
+        ratings = np.asarray(items[eval_f] if eval_f in items.columns else items.eval(eval_f))
+    elif eval_f is None:
+        ratings = items.to_numpy()
+    elif isinstance(eval_f, str):
+        raise TypeError("Must rate a Series by a function (or None)")
+    elif (batch_f := _batch_scorer(eval_f)) is not None:
+        ratings = np.asarray(batch_f(items.to_numpy()))
+    else:
+        ratings = items.map(eval_f).to_numpy()
+
+    # e.g., an expression that doesn't mention any column
+    if ratings.shape != (len(items),):
+        raise ValueError("Must rate every row")
+
+    return items.iloc[_top_k_indexes(ratings, k)]
 
-def top_k(items: list[T], eval_f: Callable[[T], float], k: int = 3) -> list[T]:
+@overload
+def top_k(items: list[T] | np.ndarray, eval_f: Callable[[T], float], k: int = 3,
+          executor: Executor | None = None, chunksize: int = RATE_CHUNKSIZE) -> list[T]: ...
+
+@overload
+def top_k(items: pd.Series, eval_f: Callable[[Any], float] | None, k: int = 3) -> pd.Series: ...
+
+@overload
+def top_k(items: pd.DataFrame, eval_f: str, k: int = 3) -> pd.DataFrame: ...
+
+def top_k(items: list[T] | np.ndarray | pd.Series | pd.DataFrame,
+          eval_f: Callable[[T], float] | str | None, k: int = 3,
+          executor: Executor | None = None,
+          chunksize: int = RATE_CHUNKSIZE) -> list[T] | pd.Series | pd.DataFrame:
     """
     Get the top-k elements in a supplied
     list according to a custom eval
@@ -96,25 +697,45 @@ def top_k(items: list[T], eval_f: Callable[[T], float], k: int = 3) -> list[T]:
 
     Parameters
     ==========
-    items: list[T]
+    items: list[T] | np.ndarray | pd.Series | pd.DataFrame
         items to evaluate
 
-    eval_f: Callable[[T], float]
-        evaluation function
+    eval_f: Callable[[T], float] | str | None
+        evaluation function (array inputs
+        are rated in one call if it is
+        in BATCH_SCORERS); for pandas
+        inputs, see _top_k_pandas
 
     k: int
         how many items to return
 
+    executor: Executor | None
+        pool to rate items on (threads for
+        I/O-bound eval_f, processes for
+        CPU-bound); None rates serially;
+        lists and arrays only
+
+    chunksize: int
+        items per executor task (unused
+        without an executor)
+
     Returns
     =======
-    list[T]
+    list[T] | pd.Series | pd.DataFrame
         top-k items ordered by the
-        evaluation function
+        evaluation function (ties go
+        to the later item); pandas
+        inputs give back their rows
 
     Raises
     ======
     ValueError
-        Too few items supplied for k
+        negative k, or too few items
+        supplied for k
+
+    TypeError
+        unsupported eval_f for the input,
+        or an executor for pandas input
     """
 
     # note: to order descending with argsort, since it is ascending, either...
@@ -123,19 +744,419 @@ def top_k(items: list[T], eval_f: Callable[[T], float], k: int = 3) -> list[T]:
     # - iterate through indexes in reverse: list[::-1]
 
     # 1. ensure there are enough items
-    if len(items) < k:
+    if k < 0 or len(items) < k:
         raise ValueError
 
+    if isinstance(items, (pd.Series, pd.DataFrame)):
+        if executor is not None:
+            raise TypeError("Must rate pandas input without an executor")
+        return _top_k_pandas(items, eval_f, k)
+
+    if not callable(eval_f):
+        raise TypeError("Must rate a list or array by a function")
+
+    if isinstance(items, np.ndarray):
+        # rate everything in one vectorized call, if we can
+        batch_f: Callable[[np.ndarray], np.ndarray] | None = _batch_scorer(eval_f)
+        rated: np.ndarray = (
+            np.asarray(batch_f(items)) if batch_f is not None
+            else np.array(_rate_all(items, eval_f, executor, chunksize))
+        )
+        return items[_top_k_indexes(rated, k)].tolist()
+
     # 2. rate each item
-    ratings: list[float] = [eval_f(i) for i in items]
+    ratings: list[float] = _rate_all(items, eval_f, executor, chunksize)
 
     # 3. argsort according to ratings
-    ordered_indexes: list[int] = np.argsort(np.array(ratings)).tolist()
+    #    (or just select the best k, if that's cheaper)
+    ordered_indexes: list[int] = _top_k_indexes(np.array(ratings), k).tolist()
 
     # 4. cross-reference the indices in order
     #    with the original items to produce
     #    the top-k list!!
-    return [items[idx] for idx in ordered_indexes[::-1][:k]]
+    return [items[idx] for idx in ordered_indexes]
+
+def _key_array(items: list[T] | np.ndarray, key: Callable[[T], Any] | np.ndarray) -> np.ndarray:
+    """
+    Turns a key function (or key
+    values) into an array of keys
+
+    Parameters
+    ==========
+    items: list[T] | np.ndarray
+        items being ranked
+
+    key: Callable[[T], Any] | np.ndarray
+        key function, or one key per item
+
+    Returns
+    =======
+    np.ndarray
+        one key per item
+
+    Raises
+    ======
+    ValueError
+        key values don't match the items
+    """
+
+    if not callable(key):
+        arr: np.ndarray = np.asarray(key)
+    elif isinstance(items, np.ndarray) and (batch_f := _batch_scorer(key)) is not None:
+        arr = np.asarray(batch_f(items))
+    else:
+        arr = np.array([key(i) for i in items])
+
+    if arr.shape != (len(items),):
+        raise ValueError("Must supply one key per item")
+
+    return arr
+
+def top_k_by(items: list[T] | np.ndarray, keys: Sequence[Callable[[T], Any] | np.ndarray],
+             k: int = 3, descending: bool | Sequence[bool] = True) -> list[T]:
+    """
+    Get the top-k elements in a supplied
+    list according to several keys,
+    compared lexicographically (first
+    key first, and so on)
+
+    Parameters
+    ==========
+    items: list[T] | np.ndarray
+        items to evaluate
+
+    keys: Sequence[Callable[[T], Any] | np.ndarray]
+        key functions, or arrays of one
+        key per item
+
+    k: int
+        how many items to return
+
+    descending: bool | Sequence[bool]
+        per key (or for all keys): True
+        means bigger is better
+
+    Returns
+    =======
+    list[T]
+        top-k items, best first; full ties
+        go to the later item (as in top_k)
+
+    Raises
+    ======
+    ValueError
+        negative k, too few items supplied
+        for k, no keys, or mismatched
+        keys/directions
+    """
+
+    if k < 0 or len(items) < k:
+        raise ValueError
+
+    directions: list[bool] = [descending] * len(keys) if isinstance(descending, bool) \
+        else list(descending)
+
+    if not keys or len(directions) != len(keys):
+        raise ValueError("Must supply one direction per key")
+
+    # orient every key so ascending means better; ranks (rather
+    # than negation) work for any dtype, and keep NaN "largest"
+    sort_keys: list[np.ndarray] = []
+    for key, desc in zip(keys, directions):
+        arr: np.ndarray = _key_array(items, key)
+        sort_keys.append(-np.unique(arr, return_inverse=True)[1] if desc else arr)
+
+    # lexsort is stable and takes its primary key last; sorting the
+    # reversed arrays makes ties go to the later index
+    order: np.ndarray = np.lexsort([a[::-1] for a in reversed(sort_keys)])
+    indexes: np.ndarray = len(items) - 1 - order[:k]
+
+    if isinstance(items, np.ndarray):
+        return items[indexes].tolist()
+
+    return [items[idx] for idx in indexes.tolist()]
+
+
+class StreamingTopK(Generic[T]):
+    """
+    Bounded-memory top-k over a stream
+    of items: only the best k seen so
+    far are kept (in a min-heap)
+    """
+
+    def __init__(self, eval_f: Callable[[T], float], k: int = 3) -> None:
+        """
+        Initializes StreamingTopK object
+
+        Parameters
+        ==========
+        eval_f: Callable[[T], float]
+            evaluation function
+
+        k: int
+            how many items to keep
+
+        Raises
+        ======
+        ValueError
+            supplied negative k
+        """
+
+        if k < 0:
+            raise ValueError("Must have non-negative k")
+
+        self._eval_f: Callable[[T], float] = eval_f
+        self._k: int = k
+        self._count: int = 0
+
+        # (rank, stream position, item) - the position
+        # breaks ties (later wins) so items are never compared
+        self._heap: list[tuple[tuple[bool, float], int, T]] = []
+
+    @staticmethod
+    def _rank(rating: float) -> tuple[bool, float]:
+        """
+        Orders ratings as top_k does: NaN
+        is "largest" (NaN itself can't be
+        compared, so it ranks as (True, 0))
+
+        Parameters
+        ==========
+        rating: float
+            what eval_f gave (anything
+            comparable, e.g. a str; only
+            floats can be NaN)
+
+        Returns
+        =======
+        tuple[bool, float]
+            comparable stand-in for rating
+        """
+
+        is_nan: bool = isinstance(rating, (float, np.floating)) and math.isnan(rating)
+        return (True, 0.0) if is_nan else (False, rating)
+
+    def _offer(self, entry: tuple[tuple[bool, float], int, T]) -> None:
+        """
+        Keeps a ranked entry if it is
+        among the best k so far
+
+        Parameters
+        ==========
+        entry: tuple[tuple[bool, float], int, T]
+            (rank, position, item)
+        """
+
+        if len(self._heap) < self._k:
+            heapq.heappush(self._heap, entry)
+        elif self._k > 0 and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def push(self, item: T) -> None:
+        """
+        Considers a single item
+
+        Parameters
+        ==========
+        item: T
+            next item in the stream
+        """
+
+        self._offer((self._rank(self._eval_f(item)), self._count, item))
+        self._count += 1
+
+    def push_all(self, items: Iterable[T]) -> None:
+        """
+        Considers a batch of items
+
+        Parameters
+        ==========
+        items: Iterable[T]
+            next items in the stream
+        """
+
+        for i in items:
+            self.push(i)
+
+    def merge(self, other: 'StreamingTopK[T]') -> None:
+        """
+        Folds in another stream, as if its
+        items had followed this stream's
+
+        Parameters
+        ==========
+        other: StreamingTopK[T]
+            top-k of the following stream
+        """
+
+        for rank, pos, item in other.entries():
+            self._offer((rank, self._count + pos, item))
+
+        self._count += len(other)
+
+    def entries(self) -> list[tuple[tuple[bool, float], int, T]]:
+        """
+        Gets the kept entries
+
+        Returns
+        =======
+        list[tuple[tuple[bool, float], int, T]]
+            (rank, stream position, item) of
+            the best k so far, in no order
+        """
+
+        return list(self._heap)
+
+    def __len__(self) -> int:
+        """How many items have been seen"""
+
+        return self._count
+
+    def result(self) -> list[T]:
+        """
+        Gets the top-k items seen so far
+
+        Returns
+        =======
+        list[T]
+            top-k items, as top_k would
+            produce for the whole stream
+
+        Raises
+        ======
+        ValueError
+            Too few items seen for k
+        """
+
+        if self._count < self._k:
+            raise ValueError
+
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+def read_lines(path: str) -> Iterator[str]:
+    """
+    Reads a text shard, one item per line
+
+    Parameters
+    ==========
+    path: str
+        shard file
+
+    Returns
+    =======
+    Iterator[str]
+        lines, without trailing newlines
+    """
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def _shard_top_k(path: str, read_shard: Callable[[str], Iterable[T]],
+                 eval_f: Callable[[T], float], k: int) -> tuple[StreamingTopK[T], float]:
+    """
+    Local top-k of one shard (runs
+    in a worker process)
+
+    Parameters
+    ==========
+    path: str
+        shard to read
+
+    read_shard: Callable[[str], Iterable[T]]
+        turns a path into items
+
+    eval_f: Callable[[T], float]
+        evaluation function
+
+    k: int
+        how many items to keep
+
+    Returns
+    =======
+    tuple[StreamingTopK[T], float]
+        the shard's top-k (at most k items,
+        all that gets sent back) and the
+        seconds spent on the shard
+    """
+
+    start: float = time.perf_counter()
+
+    local: StreamingTopK[T] = StreamingTopK(eval_f, k)
+    local.push_all(read_shard(path))
+
+    return local, time.perf_counter() - start
+
+@overload
+def sharded_top_k(paths: list[str], eval_f: Callable[[str], float], k: int = 3, *,
+                  executor: Executor | None = None) -> tuple[list[str], list[float]]: ...
+
+@overload
+def sharded_top_k(paths: list[str], eval_f: Callable[[T], float], k: int = 3,
+                  read_shard: Callable[[str], Iterable[T]] = ...,
+                  executor: Executor | None = None) -> tuple[list[T], list[float]]: ...
+
+def sharded_top_k(paths: list[str], eval_f: Callable[[Any], float], k: int = 3,
+                  read_shard: Callable[[str], Iterable[Any]] = read_lines,
+                  executor: Executor | None = None) -> tuple[list[Any], list[float]]:
+    """
+    Map-reduce top-k over shard files:
+    each shard is ranked in a worker,
+    then the partial results are merged
+
+    Parameters
+    ==========
+    paths: list[str]
+        shard files, in order (ties go
+        to items from later shards)
+
+    eval_f: Callable[[T], float]
+        evaluation function (picklable)
+
+    k: int
+        how many items to return
+
+    read_shard: Callable[[str], Iterable[T]]
+        turns a path into items (picklable);
+        defaults to one str item per line
+
+    executor: Executor | None
+        pool to run shards on; None means
+        a fresh process pool
+
+    Returns
+    =======
+    tuple[list[T], list[float]]
+        global top-k items, and the seconds
+        spent on each shard (same order
+        as paths)
+
+    Raises
+    ======
+    ValueError
+        Too few items across all shards for k
+    """
+
+    pool: Executor = ProcessPoolExecutor() if executor is None else executor
+
+    try:
+        futures = [pool.submit(_shard_top_k, p, read_shard, eval_f, k) for p in paths]
+
+        merged: StreamingTopK[Any] = StreamingTopK(eval_f, k)
+        timings: list[float] = []
+
+        # merge in shard order, so the result
+        # matches top_k over the concatenation
+        for fut in futures:
+            local, seconds = fut.result()
+            merged.merge(local)
+            timings.append(seconds)
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    return merged.result(), timings
 
 
 ##################################################
@@ -173,6 +1194,154 @@ class TestPractice(unittest.TestCase):
         for a,e in zip(actual, expected):
             self.assertAlmostEqual(a, e, places=2)
 
+    def test_normalize_array(self) -> None:
+        """Tests normalize with ndarrays"""
+
+        with self.assertRaises(ValueError):
+            normalize(np.array([]))
+
+        with self.assertRaises(ValueError):
+            normalize(np.array([1.0, 1.0]))
+
+        inputs: list[float] = [6, 8, 9, 8, 7]
+
+        for dtype in (np.float32, np.float64):
+            arr: np.ndarray = np.array(inputs, dtype=dtype)
+            actual: np.ndarray = normalize(arr)
+
+            self.assertEqual(actual.dtype, dtype)
+            np.testing.assert_allclose(actual, normalize(inputs), rtol=1e-6)
+
+            # in place
+            self.assertIs(normalize(arr, out=arr), arr)
+            np.testing.assert_array_equal(arr, actual)
+
+        # spans several blocks; ints come back as floats
+        big: np.ndarray = np.arange(3 * MINMAX_BLOCK + 5)[::-1]
+        self.assertEqual(_min_max(big), (0, 3 * MINMAX_BLOCK + 4))
+        self.assertEqual(normalize(big).tolist(), normalize(big.tolist()))
+
+        # narrow ints can't overflow, and bools work
+        narrow: list[float] = [-128, 0, 127]
+        self.assertEqual(normalize(np.array(narrow, dtype=np.int8)).tolist(), normalize(narrow))
+        self.assertEqual(normalize(np.array([True, False])).tolist(), [1.0, 0.0])
+
+        # NaNs are skipped (and stay NaN), wherever they are
+        with_nan: list[float] = [1.0, np.nan, 3.0]
+        np.testing.assert_array_equal(normalize(np.array(with_nan)), [0.0, np.nan, 1.0])
+        np.testing.assert_array_equal(normalize(with_nan), [0.0, np.nan, 1.0])
+        np.testing.assert_array_equal(normalize(with_nan[::-1]), [1.0, np.nan, 0.0])
+
+        with self.assertRaises(ValueError):
+            normalize([np.nan, 1.0])
+        with self.assertRaises(ValueError):
+            normalize(np.array([np.nan, np.nan]))
+
+        spread: np.ndarray = np.arange(200_000, dtype=np.float64)
+        spread[MINMAX_BLOCK + 5] = 1e9
+        spread[70_000] = np.nan
+        spread_out: np.ndarray = normalize(spread)
+        self.assertEqual((np.nanmin(spread_out), np.nanmax(spread_out)), (0.0, 1.0))
+
+    def test_normalize_columns(self) -> None:
+        """Tests normalize_columns against normalize"""
+
+        with self.assertRaises(ValueError):
+            normalize_columns(np.array([1.0, 2.0]))
+
+        table: np.ndarray = np.array([
+            [6, 1, 5, np.nan],
+            [8, np.nan, 5, np.nan],
+            [9, 3, 5, np.nan],
+            [8, 2, np.nan, np.nan],
+            [7, 1, 5, np.nan],
+        ])
+
+        actual, degenerate = normalize_columns(table)
+
+        self.assertEqual(degenerate, [2, 3])
+        self.assertEqual(actual[:, 0].tolist(), normalize([6, 8, 9, 8, 7]))
+        np.testing.assert_array_equal(actual[:, 1], [0, np.nan, 1, 0.5, 0])
+        self.assertTrue(np.isnan(actual[:, 2:]).all())
+
+        frame: pd.DataFrame = pd.DataFrame(table, columns=['a', 'b', 'c', 'd'])
+        actual_df, degenerate = normalize_columns(frame)
+
+        self.assertEqual(degenerate, ['c', 'd'])
+        self.assertEqual(list(actual_df.columns), ['a', 'b', 'c', 'd'])
+        np.testing.assert_array_equal(actual_df.to_numpy(), actual)
+
+        actual, degenerate = normalize_columns(np.empty((0, 2)))
+        self.assertEqual(actual.shape, (0, 2))
+        self.assertEqual(degenerate, [0, 1])
+
+    def test_minmax_scaler(self) -> None:
+        """Tests MinMaxScaler agrees with normalize"""
+
+        scaler: MinMaxScaler = MinMaxScaler()
+
+        with self.assertRaises(ValueError):
+            scaler.transform([1])
+
+        scaler.partial_fit([])
+        scaler.partial_fit([1, 1])
+
+        with self.assertRaises(ValueError):
+            scaler.transform([1])
+
+        # lists
+        chunks: list[list[float]] = [[6, 8], [9], [8, 7]]
+        scaler = MinMaxScaler()
+        for c in chunks:
+            scaler.partial_fit(c)
+
+        self.assertEqual(
+            [x for c in chunks for x in scaler.transform(c)],
+            normalize([6, 8, 9, 8, 7])
+        )
+
+        # arrays (including memory-mapped) and CSV columns
+        with tempfile.TemporaryDirectory() as tmp:
+            data: np.ndarray = np.random.default_rng(2100).normal(size=10_000)
+
+            mapped: np.ndarray = np.lib.format.open_memmap(
+                os.path.join(tmp, "data.npy"), mode="w+", dtype=np.float64, shape=data.shape
+            )
+            mapped[:] = data
+
+            scaler = MinMaxScaler()
+            for start in range(0, len(mapped), 3000):
+                scaler.partial_fit(mapped[start:start + 3000])
+            np.testing.assert_array_equal(scaler.transform(mapped), normalize(data))
+
+            csv_path: str = os.path.join(tmp, "data.csv")
+            pd.DataFrame({'x': data}).to_csv(csv_path, index=False)
+
+            scaler = MinMaxScaler()
+            for frame in pd.read_csv(csv_path, chunksize=3000):
+                scaler.partial_fit(frame['x'])
+
+            column: np.ndarray = pd.read_csv(csv_path)['x'].to_numpy()
+            np.testing.assert_array_equal(scaler.transform(column), normalize(column))
+
+        self.assertEqual(MinMaxScaler().fit_transform([100, 200]), [0, 1])
+
+        # array fit, then list transform: no narrow-int overflow
+        int8_scaler: MinMaxScaler = MinMaxScaler()
+        int8_scaler.partial_fit(np.array([-128, 0], dtype=np.int8))
+        int8_scaler.partial_fit(np.array([127], dtype=np.int8))
+        self.assertEqual(int8_scaler.transform([-128, 0, 127]), normalize([-128, 0, 127]))
+
+        # NaNs don't count towards the min/max
+        for nan_chunk in ([1.0, np.nan, 5.0], np.array([1.0, np.nan, 5.0])):
+            nan_scaler: MinMaxScaler = MinMaxScaler()
+            nan_scaler.partial_fit(nan_chunk)
+            nan_scaler.partial_fit(np.array([np.nan]))
+            self.assertEqual(nan_scaler.transform([1.0, 3.0, 5.0]), [0.0, 0.5, 1.0])
+
+        small: np.ndarray = np.array([-128, 0, 127], dtype=np.int8)
+        np.testing.assert_allclose(MinMaxScaler().fit_transform(small), [0, 128 / 255, 1])
+
     ###
 
     def test_topk_sad(self) -> None:
@@ -184,6 +1353,11 @@ class TestPractice(unittest.TestCase):
         with self.assertRaises(ValueError):
             top_k(["3.14", "7", "12"], float, k=5)
 
+        with self.assertRaises(ValueError):
+            top_k(["3.14", "7", "12"], float, k=-1)
+
+        with self.assertRaises(ValueError):
+            top_k_by(["3.14", "7", "12"], [float], k=-1)
 
     def test_topk_happy(self) -> None:
         """Tests top_k with good inputs"""
@@ -223,6 +1397,261 @@ class TestPractice(unittest.TestCase):
             ["howdy!!", "dftba"]
         )
 
+    def test_topk_partial(self) -> None:
+        """Tests top_k selection agrees with a full sort"""
+
+        rng = np.random.default_rng(2100)
+
+        # lots of ties, plus a NaN or two
+        ratings: np.ndarray = rng.integers(0, 50, size=5000).astype(float)
+        ratings[[10, 4000]] = np.nan
+
+        for k in (0, 1, 3, 17, 100):
+            self.assertTrue(_use_partition(len(ratings), k))
+            self.assertEqual(
+                _top_k_indexes(ratings, k).tolist(),
+                np.argsort(ratings, kind='stable')[::-1][:k].tolist()
+            )
+
+        items: list[int] = list(range(5000))
+        self.assertEqual(
+            top_k(items, lambda i: i % 7, k=4),
+            [4997, 4990, 4983, 4976]
+        )
+
+    def test_topk_batch(self) -> None:
+        """Tests top_k with batch-capable eval functions"""
+
+        self.assertEqual(
+            top_k(np.array([1, -2, -3, 4]), abs),
+            top_k([1, -2, -3, 4], abs)
+        )
+
+        self.assertEqual(
+            top_k(np.array(["3.14", "7", "12", "42"]), float),
+            ["42", "12", "7"]
+        )
+
+        calls: list[int] = []
+
+        def squared(x: Any) -> Any:
+            calls.append(1)
+            return x * x
+
+        register_batch_scorer(squared)
+        try:
+            rng = np.random.default_rng(2100)
+            arr: np.ndarray = rng.integers(-100, 100, size=5000)
+
+            self.assertEqual(top_k(arr, squared, k=10), top_k(arr.tolist(), squared, k=10))
+            self.assertEqual(len(calls), 1 + 5000)
+        finally:
+            del BATCH_SCORERS[squared]
+
+        # unhashable callables are rated one item at a time
+        class Negated:  # pylint: disable=too-few-public-methods
+            """Unhashable callable rating"""
+            __hash__ = None  # type: ignore[assignment]
+
+            def __call__(self, x: Any) -> float:
+                return -float(x)
+
+        small: np.ndarray = np.array([3, 1, 2])
+        self.assertEqual(top_k(small, Negated(), k=2), [1, 2])
+
+        # the most negative int has the biggest abs
+        for dtype in (np.int8, np.int64):
+            with self.subTest(dtype=dtype):
+                lowest: int = int(np.iinfo(dtype).min)
+                signed: list[int] = [lowest, 1, 5, -7]
+                self.assertEqual(top_k(np.array(signed, dtype=dtype), abs, k=2),
+                                 top_k(signed, abs, k=2))
+        self.assertEqual(top_k(pd.Series(small), Negated(), k=2).tolist(), [1, 2])
+        self.assertEqual(top_k_by(small, [Negated()], k=2), [1, 2])
+
+    def test_topk_by(self) -> None:
+        """Tests top_k_by against sorting with tuples"""
+
+        with self.assertRaises(ValueError):
+            top_k_by([1, 2], [abs])
+
+        with self.assertRaises(ValueError):
+            top_k_by([1, 2, 3], [])
+
+        with self.assertRaises(ValueError):
+            top_k_by([1, 2, 3], [abs, float], descending=[True])
+
+        with self.assertRaises(ValueError):
+            top_k_by([1, 2, 3], [np.array([1, 2])])
+
+        # single descending key is just top_k
+        self.assertEqual(
+            top_k_by(["3.14", "7", "12", "42"], [float]),
+            top_k(["3.14", "7", "12", "42"], float)
+        )
+
+        # score descending, then price ascending
+        rng = np.random.default_rng(2100)
+        scores: np.ndarray = rng.integers(0, 5, size=300)
+        prices: np.ndarray = rng.integers(0, 4, size=300).astype(float)
+        names: list[str] = [f"item{i}" for i in range(300)]
+
+        expected: list[str] = [
+            names[i] for i in sorted(range(300), key=lambda i: (-scores[i], prices[i], -i))[:15]
+        ]
+
+        self.assertEqual(
+            top_k_by(names, [scores, prices], k=15, descending=[True, False]),
+            expected
+        )
+        self.assertEqual(
+            top_k_by(names, [lambda n: scores[int(n[4:])], prices], k=15,
+                     descending=[True, False]),
+            expected
+        )
+        self.assertEqual(
+            top_k_by(np.array(names), [scores, prices], k=15, descending=[True, False]),
+            expected
+        )
+
+    def test_topk_pandas(self) -> None:
+        """Tests top_k with Series/DataFrames"""
+
+        prices: list[float] = [47.82, 27, 1.05, 27, 3]
+        frame: pd.DataFrame = pd.DataFrame({
+            'roaster': ['dunkin', 'onyx', 'pavement', 'onyx', 'dunkin'],
+            'grams': [2040, 283, 20, 340, 100],
+            'price': prices
+        })
+
+        with self.assertRaises(ValueError):
+            top_k(frame, 'price', k=6)
+
+        with self.assertRaises(TypeError):
+            top_k(frame, len)  # type: ignore[call-overload]
+
+        with self.assertRaises(TypeError):
+            top_k(frame['price'], 'price')  # type: ignore[call-overload]
+
+        with ThreadPoolExecutor(2) as pool, self.assertRaises(TypeError):
+            top_k(frame, 'price', executor=pool)  # type: ignore[call-overload]
+
+        with self.assertRaises(ValueError):
+            top_k(frame, '1 + 1')
+
+        # rows come back in the list API's order (ties -> later row)
+        by_price: pd.DataFrame = top_k(frame, 'price')
+        self.assertEqual(
+            by_price['price'].tolist(),
+            top_k(prices, float)
+        )
+        self.assertEqual(by_price.index.tolist(), [0, 3, 1])
+
+        self.assertEqual(
+            top_k(frame, 'price / grams', k=2).index.tolist(),
+            [1, 3]
+        )
+
+        series: pd.Series = frame['price']
+        self.assertEqual(top_k(series, None).tolist(), top_k(prices, float))
+        self.assertEqual(top_k(series, abs).tolist(), top_k(prices, abs))
+        self.assertEqual(
+            top_k(frame['roaster'], len, k=2).tolist(),
+            top_k(frame['roaster'].tolist(), len, k=2)
+        )
+
+    def test_topk_executor(self) -> None:
+        """Tests top_k rating items on executors"""
+
+        items: list[str] = [str(i % 13) for i in range(500)]
+        expected: list[str] = top_k(items, float, k=20)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            self.assertEqual(top_k(items, float, k=20, executor=pool, chunksize=7), expected)
+
+            with self.assertRaises(ValueError):
+                top_k(items, float, executor=pool, chunksize=0)
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(top_k(items, float, k=20, executor=pool, chunksize=64), expected)
+
+    def test_sharded_topk(self) -> None:
+        """Tests sharded_top_k agrees with top_k"""
+
+        shards: list[list[str]] = [
+            [str(i % 11) for i in range(s * 100, s * 100 + 100)] for s in range(5)
+        ]
+        shards.append([])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths: list[str] = []
+            for i, shard in enumerate(shards):
+                paths.append(os.path.join(tmp, f"shard{i}.txt"))
+                with open(paths[-1], "w", encoding="utf-8") as f:
+                    f.writelines(f"{line}\n" for line in shard)
+
+            everything: list[str] = [line for shard in shards for line in shard]
+
+            actual, timings = sharded_top_k(paths, float, k=8)
+            self.assertEqual(actual, top_k(everything, float, k=8))
+            self.assertEqual(len(timings), len(paths))
+            self.assertTrue(all(t >= 0 for t in timings))
+
+            with ThreadPoolExecutor() as pool:
+                actual, _ = sharded_top_k(paths, float, k=8, executor=pool)
+                self.assertEqual(actual, top_k(everything, float, k=8))
+
+                read_ints: Callable[[str], Iterable[int]] = lambda p: map(int, read_lines(p))
+                as_ints, _ = sharded_top_k(paths, abs, 8, read_ints, pool)
+                self.assertEqual(as_ints, top_k([int(x) for x in everything], abs, k=8))
+
+            with self.assertRaises(ValueError):
+                sharded_top_k(paths, float, k=501)
+
+    def test_streaming_topk(self) -> None:
+        """Tests StreamingTopK agrees with top_k"""
+
+        with self.assertRaises(ValueError):
+            StreamingTopK(float, k=-1)
+
+        with self.assertRaises(ValueError):
+            StreamingTopK(float).result()
+
+        stream: StreamingTopK[str] = StreamingTopK(float)
+        stream.push("3.14")
+        stream.push_all(iter(["7", "12", "42"]))
+
+        self.assertEqual(len(stream), 4)
+        self.assertEqual(stream.result(), top_k(["3.14", "7", "12", "42"], float))
+
+        # ties + merging
+        items: list[int] = list(range(1000))
+        first: StreamingTopK[int] = StreamingTopK(lambda i: i % 7, k=5)
+        second: StreamingTopK[int] = StreamingTopK(lambda i: i % 7, k=5)
+        first.push_all(items[:600])
+        second.push_all(items[600:])
+        first.merge(second)
+
+        self.assertEqual(first.result(), top_k(items, lambda i: i % 7, k=5))
+
+        # any comparable ratings, as for top_k
+        words: list[str] = ['howdy!!', 'ack', 'dftba']
+        itself: Callable[[str], Any] = lambda x: x
+        by_word: StreamingTopK[str] = StreamingTopK(itself, k=2)
+        by_word.push_all(words)
+        self.assertEqual(by_word.result(), top_k(words, itself, k=2))
+
+        # NaN ranks as top_k has it, and doesn't break the heap
+        nans: list[float] = [float('nan'), 1.0, 3.0, 2.0, float('nan'), 0.5]
+        for k in (2, 3):
+            with self.subTest(k=k):
+                with_nan: StreamingTopK[float] = StreamingTopK(float, k=k)
+                with_nan.push_all(nans)
+                self.assertEqual(
+                    [id(x) for x in with_nan.result()],
+                    [id(x) for x in top_k(nans, float, k=k)]
+                )
+
 ##################################################
 
 if __name__ == "__main__":